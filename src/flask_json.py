@@ -7,21 +7,148 @@
     :copyright: (c) 2015 - 2022 by Sergey Kozlov
     :license: BSD, see LICENSE for more details.
 """
-from collections.abc import Iterable
+import base64
+import binascii
+import cProfile
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import re
+import struct
+import sys
+import threading
+import time as _time
+import tracemalloc
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from io import BytesIO
+from json.decoder import scanstring
 from functools import partial, wraps
 from datetime import datetime, date, time
+from inspect import iscoroutinefunction
+from operator import itemgetter
+from urllib.parse import urlencode
+from weakref import WeakKeyDictionary
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None
 try:
     from speaklater import _LazyString
 except ImportError:  # pragma: no cover
     _LazyString = None
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+from werkzeug.datastructures import Headers
 from werkzeug.exceptions import default_exceptions, BadRequest, HTTPException
-from flask import current_app, jsonify, request, Request, Response, Flask
+from werkzeug.wsgi import wrap_file
+from flask import (current_app, request, Request, Response, Flask,
+                   has_app_context, has_request_context)
 from flask.json.provider import DefaultJSONProvider
 
 __version__ = '0.4.0'
 
+# Chunk size to stream large bodies and files.
+_CHUNK_SIZE = 1024 * 1024
+
+# Supported binary formats: mimetype -> (encode(obj, default), decode(data)).
+_binary_formats = {}
+if msgpack is not None:
+    _binary_formats['application/msgpack'] = (
+        lambda obj, default: msgpack.packb(obj, default=default),
+        msgpack.unpackb)
+    _binary_formats['application/x-msgpack'] = \
+        _binary_formats['application/msgpack']
+if cbor2 is not None:
+    _binary_formats['application/cbor'] = (
+        lambda obj, default: cbor2.dumps(
+            _convert_dates(obj, default),
+            default=lambda encoder, o: encoder.encode(
+                _convert_dates(default(o), default))),
+        cbor2.loads)
+
+
+# Helper function to convert datetime, date and time values with 'default'
+# before CBOR encoding: cbor2 encodes them natively (and fails on naive
+# datetime), so the 'default' is not called for them.
+def _convert_dates(obj, default):
+    if isinstance(obj, dict):
+        return {k: _convert_dates(v, default) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [_convert_dates(v, default) for v in obj]
+    elif isinstance(obj, (datetime, date, time)):
+        return default(obj)
+    return obj
+
+
+def _gzip(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+# Supported response compressions: content coding -> compress(data).
+_compressions = {'gzip': _gzip}
+if brotli is not None:
+    _compressions['br'] = lambda data: brotli.compress(data, quality=5)
+if zstandard is not None:
+    _compressions['zstd'] = \
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+
+
+# Helper function to convert list of records (dicts with the same keys) to
+# columnar form: {"columns": [...], "rows": [[...], ...]}.
+# Key names are sent once instead of per record. Other values are returned
+# as is.
+def _records_to_columns(value):
+    if type(value) is not list or not value or type(value[0]) is not dict:
+        return value
+    keys = value[0].keys()
+    if not keys:
+        return value
+    for record in value:
+        if type(record) is not dict or record.keys() != keys:
+            return value
+    columns = list(keys)
+    if len(columns) == 1:
+        key = columns[0]
+        rows = [[record[key]] for record in value]
+    else:
+        rows = list(map(itemgetter(*columns), value))
+    return {'columns': columns, 'rows': rows}
+
+
+# Helper function to apply columnar form to the response data: to the data
+# itself if it's a list or to the top-level list values of a dict.
+def _columnar(data):
+    if isinstance(data, dict):
+        return dict((k, _records_to_columns(v)) for k, v in data.items())
+    return _records_to_columns(data)
+
 
 def json_response(status_=200, headers_=None, add_status_=None, data_=None,
+                  columnar_=False, float_precision_=None, lazy_=False,
                   **kwargs):
     """Helper function to build JSON response
     with the given HTTP status and fields(``kwargs``).
@@ -85,6 +212,14 @@ def json_response(status_=200, headers_=None, add_status_=None, data_=None,
             :ref:`JSON_ADD_STATUS <opt_add_status>` is used.
         `data_`: Data to put in result JSON. It can be used instead of
             ``kwargs`` or if you want to pass non-dictionary value.
+        `columnar_`: Send lists of records with the same keys in columnar
+            form: ``{"columns": [...], "rows": [[...], ...]}``. Applied to
+            ``data_`` list or to top-level list fields.
+        `float_precision_`: Number of significant digits for floats. If not
+            set then :ref:`JSON_FLOAT_PRECISION <opt_float_precision>`
+            is used.
+        `lazy_`: Encode data only when the body is needed, see
+            :class:`.LazyJsonResponse`.
         `kwargs`: keyword arguments to put in result JSON.
 
     Returns:
@@ -98,11 +233,13 @@ def json_response(status_=200, headers_=None, add_status_=None, data_=None,
         :ref:`JSON_ADD_STATUS <opt_add_status>` are ignored and no status
         is stored in the result JSON.
 
-        Doesn't work for numeric keys if ``add_status_=True`` and
-        ``app.json.sort_keys=True``.
-
     .. versionchanged:: 0.3.2
        Added ``data_`` and non-dictionary values support.
+
+    .. versionchanged:: 0.5.0
+       Numeric keys work with ``add_status_=True`` and
+       ``app.json.sort_keys=True``. Added ``columnar_``,
+       ``float_precision_`` and ``lazy_``.
     """
     if data_ is None:
         data_ = kwargs
@@ -113,21 +250,733 @@ def json_response(status_=200, headers_=None, add_status_=None, data_=None,
         assert not kwargs
         add_status_ = False
 
+    if columnar_:
+        data_ = _columnar(data_)
+
+    config = current_app.config
     if add_status_ is not None:
         add_status = add_status_
     else:
-        add_status = current_app.config['JSON_ADD_STATUS']
+        add_status = config['JSON_ADD_STATUS']
 
     if add_status:
-        field = current_app.config['JSON_STATUS_FIELD_NAME']
+        field = config['JSON_STATUS_FIELD_NAME']
         if field not in kwargs:
             data_[field] = status_
 
-    response = jsonify(data_)
-    response.status_code = status_
+    return _make_response(data_, status_, headers_, float_precision_, lazy_)
+
+
+class JsonResponse(Response):
+    """Lightweight JSON response with already encoded body.
 
-    if headers_ is not None:
-        response.headers.extend(headers_)
+    It skips generic :class:`flask.Response` construction steps (mimetype
+    and charset processing, status parsing, body encoding), all headers are
+    built at once. Otherwise it's a regular :class:`flask.Response`.
+
+    Used by :func:`.json_response` if application's
+    :attr:`~flask.Flask.response_class` is not customized.
+
+    Usage::
+
+        body = current_app.json.encode(data)
+        return JsonResponse(body, 201, {'X-EXTRA': 123})
+
+    .. versionadded:: 0.5.0
+    """
+    # Cache of parsed HTTP statuses: status -> (status line, status code).
+    _statuses = {}
+
+    def __init__(self, body=b'', status=200, headers=None,
+                 content_type='application/json'):
+        """Construct response.
+
+        Args:
+            body: Response body (:class:`bytes`).
+            status: HTTP response status code.
+            headers: iterable or dictionary with extra header values.
+            content_type: Value of the ``Content-Type`` header.
+        """
+        # NOTE: Response.__init__() is not called intentionally,
+        # attributes are set in the same way as it does.
+        self._charset = 'utf-8'
+        try:
+            self._status, self._status_code = self._statuses[status]
+        except KeyError:
+            value = self._statuses[status] = self._clean_status(status)
+            self._status, self._status_code = value
+        # Values are known to be valid, so header list is set directly
+        # without per-value validation.
+        self.headers = Headers()
+        self.headers._list = [('Content-Type', content_type),
+                              ('Content-Length', str(len(body)))]
+        if headers is not None:
+            self.headers.extend(headers)
+        self.direct_passthrough = False
+        self._on_close = []
+        self.response = [body]
+
+
+class LazyJsonResponse(JsonResponse):
+    """JSON response which encodes data on demand.
+
+    Data is encoded when the body is accessed first time
+    (:meth:`~flask.Response.get_data`, WSGI body iteration, etc). Responses
+    without body (``HEAD`` requests, HTTP 304) and responses replaced by
+    ``after_request`` hooks are not encoded at all.
+    ``Content-Length`` is set when the data is encoded.
+
+    Used by :func:`.json_response` with ``lazy_=True``.
+
+    Usage::
+
+        return LazyJsonResponse(data, 201, {'X-EXTRA': 123})
+
+    .. versionadded:: 0.5.0
+    """
+    def __init__(self, data, status=200, headers=None, float_precision=None):
+        """Construct response.
+
+        Must be called with the active application context which is used
+        to encode the data later.
+
+        Args:
+            data: Data to encode.
+            status: HTTP response status code.
+            headers: iterable or dictionary with extra header values.
+            float_precision: Number of significant digits for floats,
+                see :meth:`.FlaskJSONProvider.dumps`.
+        """
+        app = current_app._get_current_object()
+        super(LazyJsonResponse, self).__init__(b'', status, headers,
+                                               app.json.mimetype)
+        self.headers.remove('Content-Length')
+        self._app = app
+        self._data = data
+        self._float_precision = float_precision
+        self._encoded = False
+
+    @property
+    def response(self):
+        if not self._encoded:
+            self._encode()
+        return self._response
+
+    @response.setter
+    def response(self, value):
+        # Explicitly set body replaces the data.
+        self._response = value
+        self._encoded = True
+
+    @property
+    def encoded(self):
+        """bool: ``True`` if the data is already encoded."""
+        return self._encoded
+
+    def _encode(self):
+        if has_app_context():
+            body = self._app.json.encode(
+                self._data, newline=True,
+                float_precision=self._float_precision)
+        else:
+            with self._app.app_context():
+                body = self._app.json.encode(
+                    self._data, newline=True,
+                    float_precision=self._float_precision)
+        self.response = [body]
+        self._data = None
+        self.headers['Content-Length'] = str(len(body))
+
+    def get_wsgi_headers(self, environ):
+        if self._encoded:
+            return super(LazyJsonResponse, self).get_wsgi_headers(environ)
+        status = self.status_code
+        if not (environ['REQUEST_METHOD'] == 'HEAD' or 100 <= status < 200
+                or status in (204, 304)):
+            self._encode()
+            return super(LazyJsonResponse, self).get_wsgi_headers(environ)
+
+        # Body is not sent, so don't calculate Content-Length (it requires
+        # encoding).
+        self.automatically_set_content_length = False
+        try:
+            return super(LazyJsonResponse, self).get_wsgi_headers(environ)
+        finally:
+            del self.automatically_set_content_length
+
+
+# Helper function to create JSON response with the given data.
+# It's a low level function used by all response building functions.
+# 'float_precision' overrides JSON_FLOAT_PRECISION if set, 'lazy' enables
+# LazyJsonResponse.
+def _make_response(data, status=200, headers=None, float_precision=None,
+                   lazy=False):
+    app = current_app._get_current_object()
+    if not app.config['JSON_TRACE_MEMORY']:
+        return _encode_response(app, data, status, headers, float_precision,
+                                lazy)
+
+    base = _start_memory_trace()
+    try:
+        response = _encode_response(app, data, status, headers,
+                                    float_precision, lazy)
+        _finish_memory_trace(app, response, base)
+    finally:
+        _stop_memory_trace()
+    return response
+
+
+# Number of active memory traces and whether tracing was started by them
+# (so it must be stopped by the last one). Tracing is process-wide and slows
+# down all allocations, so it's enabled only while responses are built.
+_memory_traces = [0, False]
+_memory_traces_lock = threading.Lock()
+
+
+# Helper function to start memory tracing; returns current traced memory
+# size. Concurrent traces share the tracing, the peak is reset only by the
+# first one.
+def _start_memory_trace():
+    with _memory_traces_lock:
+        if not _memory_traces[0]:
+            _memory_traces[1] = not tracemalloc.is_tracing()
+            if _memory_traces[1]:
+                tracemalloc.start()
+            # Python < 3.9 can't reset the peak; only net allocations are
+            # measured.
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        _memory_traces[0] += 1
+    return tracemalloc.get_traced_memory()[0]
+
+
+# Helper function to stop memory tracing started by _start_memory_trace().
+def _stop_memory_trace():
+    with _memory_traces_lock:
+        _memory_traces[0] -= 1
+        if not _memory_traces[0] and _memory_traces[1]:
+            tracemalloc.stop()
+
+
+# Helper function to store peak memory used for the response building to
+# the response.json_memory_peak attribute. Large responses are logged,
+# see JSON_MEMORY_LOG_THRESHOLD.
+def _finish_memory_trace(app, response, base):
+    current, peak = tracemalloc.get_traced_memory()
+    if not hasattr(tracemalloc, 'reset_peak'):  # pragma: no cover
+        peak = current
+    response.json_memory_peak = size = max(peak - base, 0)
+    threshold = app.config['JSON_MEMORY_LOG_THRESHOLD']
+    if threshold is not None and size >= threshold:
+        app.logger.warning(
+            'JSON response %s used %d bytes of memory (%d bytes body).',
+            request.full_path if has_request_context() else '-', size,
+            response.calculate_content_length() or 0)
+
+
+# Helper function to encode data and create the response.
+# Used by _make_response().
+def _encode_response(app, data, status, headers, float_precision, lazy):
+    provider = app.json
+
+    # Custom response class must be respected, so use generic way.
+    if app.response_class is not Response:
+        response = provider.response(data)
+        response.status_code = status
+        if headers is not None:
+            response.headers.extend(headers)
+        return response
+
+    mimetype = _negotiate(app)
+    ranges = status == 200 and app.config['JSON_ACCEPT_RANGES']
+    # Range requests need the encoded body, so lazy response is not used.
+    if lazy and mimetype is None and not ranges:
+        response = LazyJsonResponse(data, status, headers, float_precision)
+        body = None
+    else:
+        if mimetype is None:
+            body = provider.encode(data, newline=True,
+                                   float_precision=float_precision)
+            mimetype = provider.mimetype
+        else:
+            body = provider.dumps_binary(data, mimetype,
+                                         float_precision=float_precision)
+        response = JsonResponse(body, status, headers, mimetype)
+
+    if app.config['JSON_BINARY_FORMATS']:
+        response.vary.add('Accept')
+    if body is not None:
+        if has_request_context() and getattr(request, '_json_shared', False):
+            # Response will be stored, so it's finished by _finish_shared().
+            response._json_unfinished = True
+        else:
+            _finish_body(app, response, body, ranges)
+    return response
+
+
+# Helper function to compress the response body and handle Range requests
+# (if 'ranges' is set). Ranges apply to the compressed body.
+def _finish_body(app, response, body, ranges):
+    body = _compress_response(app, response, body)
+    if ranges:
+        _process_range(response, body)
+    return response
+
+
+# Helper function to compress the response body with the best content coding
+# accepted by the client, see JSON_COMPRESSION. Compressed bodies are reused
+# by FlaskJSONProvider.compress(). Uncompressed body is kept in the
+# response._json_body, so response caches store it instead.
+# Returns the body to send.
+def _compress_response(app, response, body):
+    encodings = app.config['JSON_COMPRESSION']
+    if not encodings or not has_request_context():
+        return body
+    response.vary.add('Accept-Encoding')
+    if len(body) < app.config['JSON_COMPRESSION_MIN_SIZE']:
+        return body
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding is None:
+        return body
+    data = app.json.compress(body, encoding)
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    response._json_body = body
+    return data
+
+
+# Helper function to get ETag value for the response: compressed responses
+# are different representations, so content coding is added to the tag.
+def _encoded_etag(value, response):
+    encoding = response.headers.get('Content-Encoding')
+    return '%s-%s' % (value, encoding) if encoding else value
+
+
+# Helper function to get the response body before compression.
+def _response_body(response):
+    body = getattr(response, '_json_body', None)
+    return response.get_data() if body is None else body
+
+
+# Helper function to select binary response format by the Accept header.
+# Returns None if JSON must be used. See JSON_BINARY_FORMATS.
+def _negotiate(app):
+    formats = app.config['JSON_BINARY_FORMATS']
+    if not formats or not has_request_context():
+        return None
+    best = request.accept_mimetypes.best_match([app.json.mimetype] + formats)
+    return best if best in formats else None
+
+
+# Helper function to iterate over the body slice without copying the whole
+# body; used for partial responses.
+def _iter_range(body, start, stop):
+    view = memoryview(body)
+    for pos in range(start, stop, _CHUNK_SIZE):
+        yield view[pos:min(pos + _CHUNK_SIZE, stop)].tobytes()
+
+
+# Helper function to handle Range requests for the response with the given
+# body. See JSON_ACCEPT_RANGES. View's version tag (see @as_json(etag=))
+# is used as ETag if set, otherwise the body hash. Response must be already
+# compressed (see _finish_body()), so partial content is a part of
+# the compressed body. Conditional headers
+# (If-None-Match, If-Range) are checked too, so matching requests get
+# HTTP 304.
+def _process_range(response, body):
+    response.headers['Accept-Ranges'] = 'bytes'
+    context = has_request_context()
+    if 'etag' not in response.headers:
+        etag = getattr(request, '_json_etag', None) if context else None
+        if etag is None:
+            response.set_etag(hashlib.sha1(body).hexdigest())
+        else:
+            response.set_etag(_encoded_etag(etag, response))
+    if not context:
+        return response
+    response.make_conditional(request, accept_ranges=True,
+                              complete_length=len(body))
+    if response.status_code == 206:
+        rng = response.content_range
+        response.response = _iter_range(body, rng.start, rng.stop)
+    return response
+
+
+# Headers which describe the encoded body and are set again for the
+# stored responses. Tags and ranges depend on the content coding, so they
+# are computed for each representation by _finish_body().
+_body_headers = ('Content-Type', 'Content-Length', 'Content-Encoding',
+                 'ETag', 'Accept-Ranges', 'Content-Range')
+
+
+# Helper function to get application settings which affect constant
+# responses content. Cached responses are rebuilt if the settings change.
+def _constant_key(app):
+    provider = app.json
+    config = app.config
+    return (config['JSON_ADD_STATUS'], config['JSON_STATUS_FIELD_NAME'],
+            provider.sort_keys, provider.ensure_ascii, provider.compact,
+            app.debug, config.get('JSON_FLOAT_PRECISION'))
+
+
+# Helper function to call a view which response is stored and shared by
+# other requests. JSON responses created by the call are not compressed and
+# not processed for Range and conditional headers of the current request,
+# see _finish_shared().
+def _call_shared(view, *args, **kwargs):
+    shared = getattr(request, '_json_shared', False)
+    request._json_shared = True
+    try:
+        return view(*args, **kwargs)
+    finally:
+        request._json_shared = shared
+
+
+# Helper function to finish the response returned by _call_shared() or
+# restored from the storage for the current request. Nothing is done if
+# the response is stored by an outer view too.
+def _finish_shared(response):
+    if (not getattr(response, '_json_unfinished', False)
+            or getattr(request, '_json_shared', False)):
+        return response
+    response._json_unfinished = False
+    app = current_app._get_current_object()
+    ranges = (response.status_code == 200
+              and app.config['JSON_ACCEPT_RANGES'])
+    return _finish_body(app, response, response.get_data(), ranges)
+
+
+# Helper function to serve pre-encoded response.
+# 'cache' maps application to the encoded response and 'build' creates
+# the response if it's not cached yet (or settings are changed).
+def _constant_response(cache, build):
+    app = current_app._get_current_object()
+    # Only JSON is cached.
+    if app.response_class is not Response or _negotiate(app) is not None:
+        return build()
+
+    key = _constant_key(app)
+    entry = cache.get(app)
+    if entry is None or entry[0] != key:
+        # Full body is stored, Range and conditional headers of the first
+        # request don't affect it.
+        response = _call_shared(build)
+        headers = [(k, v) for k, v in response.headers
+                   if k not in _body_headers]
+        entry = (key, _response_body(response), response.status_code,
+                 headers, response.headers['Content-Type'])
+        cache[app] = entry
+
+    response = JsonResponse(entry[1], entry[2], entry[3], entry[4])
+    response._json_unfinished = True
+    return _finish_shared(response)
+
+
+def json_constant(data=None, status_=200, headers_=None, add_status_=None):
+    """Creates a view function which returns the same JSON response on
+    every call.
+
+    The response is encoded only once per application and then the encoded
+    body is reused, so it's useful for health checks, acknowledgements,
+    etc::
+
+        app.add_url_rule('/health', 'health', json_constant({'ok': True}))
+        # {"ok": true, "status": 200}
+
+    Parameters are the same as for :func:`.json_response`.
+    If application settings which affect the result JSON are changed
+    (:ref:`JSON_ADD_STATUS <opt_add_status>`,
+    :ref:`JSON_STATUS_FIELD_NAME <opt_status_name>`, JSON provider
+    formatting options) then the response is encoded again.
+
+    Args:
+        `data`: Data to put in result JSON.
+        `status_`: HTTP response status code.
+        `headers_`: iterable or dictionary with header values.
+        `add_status_`: Add status field. If not set then
+            :ref:`JSON_ADD_STATUS <opt_add_status>` is used.
+
+    Returns:
+        View function.
+
+    See Also:
+        :func:`@as_json <flask_json.as_json>` with ``static=True``.
+
+    .. versionadded:: 0.5.0
+    """
+    cache = WeakKeyDictionary()
+
+    def build():
+        # json_response() modifies the dict, so pass a copy.
+        value = dict(data) if isinstance(data, dict) else data
+        return json_response(status_, headers_, add_status_, data_=value)
+
+    def view():
+        return _constant_response(cache, build)
+
+    return view
+
+
+# Cache of checked JSON files:
+# path -> (mtime, size, checksum or None, validated).
+_json_files = {}
+
+
+# Helper function to validate JSON file and calculate it's checksum.
+# Results are cached until file modification, only missing checks are done.
+# Validation parses the whole file (json.loads() needs it in memory),
+# so it's optional.
+def _check_json_file(path, f, stat, validate, checksum):
+    info = _json_files.get(path)
+    if (info is None or info[0] != stat.st_mtime_ns
+            or info[1] != stat.st_size):
+        info = (stat.st_mtime_ns, stat.st_size, None, False)
+    digest, validated = info[2], info[3]
+    validate = validate and not validated
+    checksum = checksum and digest is None
+    if not validate and not checksum:
+        return digest
+
+    if stat.st_size:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if validate:
+                try:
+                    json.loads(mm[:])
+                except ValueError as e:
+                    raise ValueError('Invalid JSON file %s: %s' % (path, e))
+            if checksum:
+                digest = hashlib.sha256(mm).hexdigest()
+    elif validate:
+        raise ValueError('Invalid JSON file %s: file is empty' % path)
+
+    _json_files[path] = (info[0], info[1], digest, validated or validate)
+    return digest
+
+
+# Helper function to stream JSONP wrapped file content.
+def _iter_json_p_file(mm, end, prefix, suffix):
+    yield prefix
+    for pos in range(0, end, _CHUNK_SIZE):
+        yield mm[pos:min(pos + _CHUNK_SIZE, end)]
+    yield suffix
+
+
+def json_file_response(path, status_=200, headers_=None, validate=False,
+                       checksum=False, callback=None):
+    """Creates response with pre-serialized JSON file content.
+
+    The file is not loaded into memory: it's passed to the WSGI server's
+    ``wsgi.file_wrapper`` (which may use ``sendfile()``)::
+
+        @app.route('/snapshot')
+        def snapshot():
+            return json_file_response('/data/snapshot.json')
+
+    File checks (see ``validate`` and ``checksum``) are done once and the
+    result is cached until the file is modified. ``ETag`` and
+    ``Last-Modified`` headers are set and
+    conditional requests are handled (``If-None-Match``,
+    ``If-Modified-Since``). Range requests are supported if
+    :ref:`JSON_ACCEPT_RANGES <opt_accept_ranges>` is enabled.
+
+    If ``callback`` is set then JSONP response is generated; file content is
+    streamed with callback prefix and suffix chunks::
+
+        @app.route('/snapshot.js')
+        def snapshot_js():
+            return json_file_response('/data/snapshot.json',
+                                      callback=request.args['callback'])
+
+    Note:
+        File content is sent as is, so HTTP status field is not added.
+
+    Args:
+        `path`: JSON file path.
+        `status_`: HTTP response status code.
+        `headers_`: iterable or dictionary with header values.
+        `validate`: Check if file contains valid JSON. The whole file is
+            parsed, so it takes as much memory as loading the file; use it
+            for small files or check large files when they are generated.
+        `checksum`: Use SHA-256 checksum of the file content as ``ETag``.
+            If not set then the tag is built from file modification time and
+            size. Checksum is cached too.
+        `callback`: JSONP callback name.
+
+    Returns:
+        flask.Response: Response with the file content.
+
+    Raises:
+        ValueError: if file content is not a valid JSON.
+        BadRequest: if JSONP callback name is invalid.
+
+    .. versionadded:: 0.5.0
+    """
+    path = os.fspath(path)
+    if callback is not None and _JSONP_CALLBACK_RE.fullmatch(callback) is None:
+        raise BadRequest('Invalid JSONP callback parameter.')
+
+    f = open(path, 'rb')
+    try:
+        stat = os.fstat(f.fileno())
+        digest = _check_json_file(path, f, stat, validate, checksum)
+    except Exception:
+        f.close()
+        raise
+
+    if callback is None:
+        response = current_app.response_class(
+            wrap_file(request.environ, f, _CHUNK_SIZE), status_,
+            headers_, mimetype=current_app.json.mimetype,
+            direct_passthrough=True)
+        response.content_length = stat.st_size
+    else:
+        # Status and headers are discarded for JSONP.
+        mm, end = None, 0
+        if stat.st_size:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            end = len(mm)
+            while end and mm[end - 1] in b' \t\r\n':
+                end -= 1
+        prefix = callback.encode('ascii') + b'('
+        response = current_app.response_class(
+            _iter_json_p_file(mm, end, prefix, b');'),
+            content_type='application/javascript')
+        response.content_length = len(prefix) + end + 2
+        if mm is not None:
+            response.call_on_close(mm.close)
+        response.call_on_close(f.close)
+
+    if digest is None:
+        digest = '%x-%x' % (stat.st_mtime_ns, stat.st_size)
+    response.set_etag(digest)
+    response.last_modified = int(stat.st_mtime)
+
+    if (callback is None and response.status_code == 200
+            and current_app.config['JSON_ACCEPT_RANGES']):
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response.make_conditional(request, accept_ranges=True,
+                                         complete_length=stat.st_size)
+    return response.make_conditional(request)
+
+
+# Helper functions to convert keyset pagination key to opaque cursor token
+# and back. The token is URL safe base64 of the JSON encoded key value.
+def _encode_cursor(value):
+    data = current_app.json.dumps(value).encode('utf-8')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _decode_cursor(token):
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        return current_app.json.loads(data)
+    except (binascii.Error, ValueError):
+        raise JsonError(description='Invalid cursor.')
+
+
+def paginated_response(query_iter, key, limit=None, status_=200,
+                       headers_=None, add_status_=None, **kwargs):
+    """Helper function to build keyset (cursor) paginated JSON response.
+
+    Instead of skipping ``offset`` rows the next page is requested with the
+    key of the last item of the current page, so deep pages are as cheap as
+    the first one.
+
+    ``query_iter`` is a callable which accepts the key of the last seen item
+    (``None`` for the first page) and maximum number of items and returns
+    an iterable of items sorted by the ``key``::
+
+        def query_users(after, limit):
+            query = User.query.order_by(User.id)
+            if after is not None:
+                query = query.filter(User.id > after)
+            return query.limit(limit)
+
+        @app.route('/users')
+        def users():
+            return paginated_response(query_users, key='id')
+            # {"items": [...], "next": "MTI", "status": 200}
+
+    The response contains page ``items`` and ``next`` cursor which is an
+    opaque token (or ``null`` for the last page). Client passes it back in
+    the ``cursor`` URL query parameter to get the next page. The same URL is
+    also added to the ``Link`` header::
+
+        Link: <http://localhost/users?cursor=MTI>; rel="next"
+
+    Page size may be requested with the ``limit`` URL query parameter, it's
+    limited by :ref:`JSON_PAGINATION_MAX_LIMIT <opt_pagination_max_limit>`.
+
+    The page is encoded before the function returns (with the extension's
+    encoders), so encoding errors are raised instead of truncating the
+    body. The response is built like in :func:`.json_response`:
+    HTTP status field is added in the same way, binary formats, compression
+    and ranges are supported.
+
+    Args:
+        `query_iter`: callable returning page items.
+        `key`: name of the item's key field (dict key or attribute) or
+            callable which returns key value for the given item.
+            Key value must be JSON serializable.
+        `limit`: page size. If not set then ``limit`` URL query parameter or
+            :ref:`JSON_PAGINATION_LIMIT <opt_pagination_limit>` is used.
+        `status_`: HTTP response status code.
+        `headers_`: iterable or dictionary with header values.
+        `add_status_`: Add status field. If not set then
+            :ref:`JSON_ADD_STATUS <opt_add_status>` is used.
+        `kwargs`: extra keyword arguments to put in result JSON.
+
+    Returns:
+        flask.Response: Response with the JSON content.
+
+    Raises:
+        JsonError: if ``cursor`` URL query parameter is invalid.
+
+    .. versionadded:: 0.5.0
+    """
+    assert 'items' not in kwargs and 'next' not in kwargs
+    config = current_app.config
+
+    if limit is None:
+        limit = request.args.get('limit', type=int)
+        if limit is None or limit <= 0:
+            limit = config['JSON_PAGINATION_LIMIT']
+        else:
+            limit = min(limit, config['JSON_PAGINATION_MAX_LIMIT'])
+
+    token = request.args.get('cursor')
+    after = _decode_cursor(token) if token else None
+
+    if not callable(key):
+        name = key
+
+        def key(item):
+            if isinstance(item, dict):
+                return item[name]
+            return getattr(item, name)
+
+    # Fetch one extra item to find out if there is a next page.
+    items = list(query_iter(after, limit + 1))
+    next_token = None
+    if len(items) > limit:
+        del items[limit:]
+        next_token = _encode_cursor(key(items[-1]))
+
+    data = dict(items=items, next=next_token)
+    data.update(kwargs)
+    if add_status_ is None:
+        add_status_ = config['JSON_ADD_STATUS']
+    if add_status_:
+        data.setdefault(config['JSON_STATUS_FIELD_NAME'], status_)
+
+    response = _make_response(data, status_, headers_)
+
+    if next_token is not None:
+        args = [(k, v) for k, v in request.args.items(multi=True)
+                if k != 'cursor']
+        args.append(('cursor', next_token))
+        url = '%s?%s' % (request.base_url, urlencode(args))
+        response.headers.add('Link', '<%s>; rel="next"' % url)
 
     return response
 
@@ -148,28 +997,53 @@ def _normalize_view_tuple(tuple_):
 
 # Helper function to create JSON response for the given data.
 # Raises an error if the data is not convertible to JSON.
-def _build_response(data, add_status=None):
+def _build_response(data, add_status=None, columnar=False,
+                    float_precision=None, lazy=False):
+    options = dict(columnar_=columnar, float_precision_=float_precision,
+                   lazy_=lazy)
     if data is None:
-        return json_response(add_status_=add_status)
+        return json_response(add_status_=add_status, **options)
     elif isinstance(data, dict):
-        return json_response(add_status_=add_status, **data)
+        return _dict_response(data, 200, None, add_status, options)
     elif isinstance(data, Response):
         assert current_app.json.mimetype == data.mimetype
         return data
     elif isinstance(data, tuple):
         d, status, headers = _normalize_view_tuple(data)
         if isinstance(d, dict):
-            return json_response(status_=status or 200, headers_=headers,
-                                 add_status_=add_status, **d)
+            return _dict_response(d, status or 200, headers, add_status,
+                                  options)
         else:
             return json_response(status_=status or 200, headers_=headers,
-                                 add_status_=add_status, data_=d)
+                                 add_status_=add_status, data_=d, **options)
     else:
-        return json_response(data_=data)
+        return json_response(data_=data, **options)
         # raise ValueError('Unsupported return value.')
 
 
-def as_json(f):
+# Helper function to create JSON response for the view's dict.
+# The dict is passed as data, so its keys can't clash with json_response()
+# arguments; status field is added unless the view sets it.
+def _dict_response(data, status, headers, add_status, options):
+    data = dict(data)
+    field = _status_field(current_app, add_status)
+    if field is not None and field not in data:
+        data[field] = status
+    return json_response(status_=status, headers_=headers, data_=data,
+                         add_status_=False, **options)
+
+
+# Helper function to get name of the HTTP status field for the given app.
+# Returns None if status field is disabled.
+def _status_field(app, add_status=None):
+    if add_status is None:
+        add_status = app.config['JSON_ADD_STATUS']
+    return app.config['JSON_STATUS_FIELD_NAME'] if add_status else None
+
+
+def as_json(f=None, returns=None, add_status=None, static=False, cache=None,
+            coalesce=False, columnar=False, float_precision=None,
+            timing=None, lazy=False, etag=None):
     """This decorator converts view's return value to JSON response.
 
     The decorator expects the following return values:
@@ -199,12 +1073,80 @@ def as_json(f):
         def view_comp():
             return dict(param=value, param2=value2), 400
 
+    Expensive views may share a single call between concurrent identical
+    requests, waiting requests get a copy of the encoded response (or the
+    raised error)::
+
+        @as_json(coalesce=True)
+        def view_slow():
+            return compute_report()
+
+        # Also requests must have the same Accept-Language header.
+        @as_json(coalesce=['Accept-Language'])
+        def view_slow2():
+            return compute_report()
+
+    If the view always returns the same value then it may be marked as
+    ``static``. It will be called and encoded only once per application
+    (see :func:`.json_constant` for details)::
+
+        @as_json(static=True)
+        def health():
+            return dict(ok=True)
+
+    If the view always returns values of the same type then it may be
+    declared with ``returns``. In this case return value is not inspected
+    and converted directly to HTTP 200 JSON response which is faster::
+
+        @as_json(returns=dict, add_status=False)
+        def view_fast():
+            return dict(param=value)
+
+        @as_json(returns=list)
+        def view_fast2():
+            return [1, 2, 3]
+
     Note:
         If wrapped view returns Flask :class:`~flask.Response` then it will be
         used as is without passing to :func:`.json_response`. But the response
         must be a JSON response (mimetype must contain ``application/json``),
         otherwise ``AssertionError`` will be raised.
 
+        With ``returns=dict`` HTTP status field is put to the returned
+        dictionary in place. Configuration used for it
+        (:ref:`JSON_ADD_STATUS <opt_add_status>` and
+        :ref:`JSON_STATUS_FIELD_NAME <opt_status_name>`) is read once per
+        application.
+
+    Args:
+        returns: Type of the view's return value: ``dict`` or any other type
+            which is converted to JSON as is (``list``, ``int``, etc).
+        add_status: Add status field. If not set then
+            :ref:`JSON_ADD_STATUS <opt_add_status>` is used.
+        static: Call the view once and reuse encoded response.
+            The view must not accept arguments.
+        cache: Cache for encoded responses, e.g.
+            :class:`.SharedMemoryCache` (or any object with the same
+            ``get(key)`` and ``set(key, value)`` methods). Successful
+            ``GET`` responses are cached by URL.
+        coalesce: Share single view call between concurrent identical
+            ``GET``/``HEAD`` requests (same method and URL). May be a list
+            of header names which must be equal too. See
+            :ref:`JSON_COALESCE_TIMEOUT <opt_coalesce_timeout>`.
+        columnar: Send lists of records in columnar form
+            (see ``columnar_`` in :func:`.json_response`).
+        float_precision: Number of significant digits for floats. If not
+            set then :ref:`JSON_FLOAT_PRECISION <opt_float_precision>`
+            is used.
+        timing: Add ``Server-Timing`` header. If not set then
+            :ref:`JSON_SERVER_TIMING <opt_server_timing>` is used.
+        lazy: Encode data only when the body is needed, see
+            :class:`.LazyJsonResponse`.
+        etag: Function which returns cheap version key of the response
+            (like update time); it's called with the view's arguments.
+            ``GET`` requests with matching ``If-None-Match`` get HTTP 304
+            without calling the view. ``None`` disables the check.
+
     Returns:
         flask.Response: Response with the JSON content.
 
@@ -213,18 +1155,640 @@ def as_json(f):
 
     See Also:
         :func:`.json_response`
+
+    .. versionchanged:: 0.5.0
+       Added ``returns``, ``add_status``, ``static``, ``cache``,
+       ``coalesce``, ``columnar``, ``float_precision``, ``timing``,
+       ``lazy`` and ``etag`` parameters; ``async`` views support.
+    """
+    if f is None:
+        return partial(as_json, returns=returns, add_status=add_status,
+                       static=static, cache=cache, coalesce=coalesce,
+                       columnar=columnar, float_precision=float_precision,
+                       timing=timing, lazy=lazy, etag=etag)
+
+    if iscoroutinefunction(f):
+        f = _sync_view(f)
+    if timing is not False:
+        f = _timed_call(f)
+
+    if static:
+        responses = WeakKeyDictionary()
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            assert not args and not kwargs
+            return _constant_response(
+                responses,
+                lambda: _build_response(f(), add_status, columnar,
+                                        float_precision))
+
+    elif returns is None:
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            rv = f(*args, **kwargs)
+            return _build_response(rv, add_status, columnar,
+                                   float_precision, lazy)
+
+    elif returns is dict:
+        # Status field name per application.
+        fields = WeakKeyDictionary()
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            rv = f(*args, **kwargs)
+            app = current_app._get_current_object()
+            try:
+                field = fields[app]
+            except KeyError:
+                field = fields[app] = _status_field(app, add_status)
+            if columnar:
+                rv = _columnar(rv)
+            if field is not None and field not in rv:
+                rv[field] = 200
+            return _make_response(rv, float_precision=float_precision,
+                                  lazy=lazy)
+
+    elif columnar:
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            return _make_response(_columnar(f(*args, **kwargs)),
+                                  float_precision=float_precision, lazy=lazy)
+
+    else:
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            return _make_response(f(*args, **kwargs),
+                                  float_precision=float_precision, lazy=lazy)
+
+    if coalesce:
+        headers = () if coalesce is True else tuple(coalesce)
+        wrapper = _coalesced_view(wrapper, headers)
+    if cache is not None:
+        wrapper = _cached_view(wrapper, cache)
+    if etag is not None:
+        wrapper = _versioned_view(wrapper, etag)
+    return _diagnosed_view(wrapper, timing)
+
+
+class SharedMemoryCache(object):
+    """Cache of encoded responses shared between processes.
+
+    Entries are stored in a fixed size :mod:`multiprocessing.shared_memory`
+    block, so response encoded by one worker process is available to all
+    other workers on the host. Use it with
+    :func:`@as_json(cache=...) <flask_json.as_json>`::
+
+        cache = SharedMemoryCache(slots=4096, slot_size=64 * 1024, ttl=60)
+
+        @app.route('/stats')
+        @as_json(cache=cache)
+        def stats():
+            return compute_stats()
+
+    The memory is split into ``slots`` of ``slot_size`` bytes. Key hash
+    selects a set of ``ways`` slots where the entry may be stored; if the
+    set is full then least recently used entry is evicted. Values larger
+    than ``slot_size`` are not cached.
+
+    Note:
+        The cache must be created before worker processes are forked
+        (for example, with gunicorn ``--preload``) to share the lock and the
+        memory block. Other processes may attach to the existing block by
+        ``name`` with ``create=False``, but then ``lock`` must be shared too.
+
+    .. versionadded:: 0.5.0
     """
+    # magic, slots, slot size, ways, LRU clock.
+    _header = struct.Struct('<8sIIIQ4x')
+    # key digest, expiration time, last use clock, value length.
+    _slot = struct.Struct('<16sdQI4x')
+    _clock = struct.Struct('<Q')
+    _magic = b'FJSONSHM'
+
+    def __init__(self, name=None, slots=1024, slot_size=64 * 1024, ways=8,
+                 ttl=None, lock=None, create=True):
+        """Create new or attach to the existing cache.
+
+        Args:
+            name: Shared memory block name. Random name is used if not set.
+            slots: Number of entries.
+            slot_size: Maximum size of the entry value.
+            ways: Number of slots in the set (must divide ``slots``).
+            ttl: Default entry time to live in seconds (``None`` - forever).
+            lock: Lock shared between processes. New
+                :func:`multiprocessing.Lock` is created if not set.
+            create: Create new memory block or attach to existing one.
+                If attached then ``slots``, ``slot_size`` and ``ways`` are
+                read from the block.
+        """
+        if shared_memory is None:  # pragma: no cover
+            raise RuntimeError('SharedMemoryCache requires Python 3.8+.')
+
+        if create:
+            if slots % ways:
+                raise ValueError('slots must be multiple of ways.')
+            size = self._header.size + slots * (self._slot.size + slot_size)
+            self._shm = shared_memory.SharedMemory(name, True, size)
+            self._header.pack_into(self._shm.buf, 0, self._magic, slots,
+                                   slot_size, ways, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name)
+            magic, slots, slot_size, ways, _ = self._header.unpack_from(
+                self._shm.buf, 0)
+            if magic != self._magic:
+                self._shm.close()
+                raise ValueError('Not a SharedMemoryCache block: %s' % name)
+
+        self.name = self._shm.name
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ways = ways
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._owner = create
+        self._lock = lock if lock is not None else multiprocessing.Lock()
+
+    @staticmethod
+    def _digest(key):
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def _offset(self, index):
+        return self._header.size + index * (self._slot.size + self.slot_size)
+
+    # Increments and returns LRU clock. Must be called under the lock.
+    def _tick(self):
+        buf = self._shm.buf
+        clock = self._clock.unpack_from(buf, 20)[0] + 1
+        self._clock.pack_into(buf, 20, clock)
+        return clock
+
+    # Finds slot with the given digest in the digest's set.
+    # Returns (slot index or None, slot to replace).
+    # Must be called under the lock.
+    def _find(self, digest):
+        buf = self._shm.buf
+        sets = self.slots // self.ways
+        start = int.from_bytes(digest[:8], 'little') % sets * self.ways
+        victim = victim_used = None
+        now = _time.time()
+        for index in range(start, start + self.ways):
+            d, expires, used, _ = self._slot.unpack_from(
+                buf, self._offset(index))
+            if used and d == digest:
+                if expires and expires < now:
+                    return None, index
+                return index, index
+            if victim_used is None or used < victim_used:
+                victim, victim_used = index, used
+        return None, victim
+
+    def get(self, key):
+        """Returns cached value (:class:`bytes`) or ``None``."""
+        digest = self._digest(key)
+        with self._lock:
+            index, _ = self._find(digest)
+            if index is None:
+                self.misses += 1
+                return None
+            buf = self._shm.buf
+            offset = self._offset(index)
+            _, expires, _, length = self._slot.unpack_from(buf, offset)
+            self._slot.pack_into(buf, offset, digest, expires, self._tick(),
+                                 length)
+            offset += self._slot.size
+            value = bytes(buf[offset:offset + length])
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Puts value (:class:`bytes`) to the cache.
+
+        Returns:
+            ``False`` if the value is too large to be cached.
+        """
+        length = len(value)
+        if length > self.slot_size:
+            return False
+        if ttl is None:
+            ttl = self.ttl
+        expires = _time.time() + ttl if ttl else 0.0
+        digest = self._digest(key)
+        with self._lock:
+            index, victim = self._find(digest)
+            offset = self._offset(index if index is not None else victim)
+            buf = self._shm.buf
+            self._slot.pack_into(buf, offset, digest, expires, self._tick(),
+                                 length)
+            offset += self._slot.size
+            buf[offset:offset + length] = value
+        return True
+
+    def delete(self, key):
+        """Removes value from the cache."""
+        digest = self._digest(key)
+        with self._lock:
+            index, _ = self._find(digest)
+            if index is not None:
+                self._slot.pack_into(self._shm.buf, self._offset(index),
+                                     b'', 0.0, 0, 0)
+
+    def clear(self):
+        """Removes all values from the cache."""
+        with self._lock:
+            buf = self._shm.buf
+            for index in range(self.slots):
+                self._slot.pack_into(buf, self._offset(index), b'', 0.0, 0, 0)
+
+    def close(self):
+        """Detaches from the shared memory. If the cache was created by this
+        object then the memory block is destroyed.
+        """
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+# Helper functions to convert response to bytes and back for response caches.
+# Format: <head length><JSON head: [status, content type, headers]><body>.
+def _pack_response(response):
+    headers = [(k, v) for k, v in response.headers if k not in _body_headers]
+    head = json.dumps([response.status_code, response.headers['Content-Type'],
+                       headers]).encode('utf-8')
+    return b''.join((struct.pack('<I', len(head)), head,
+                     _response_body(response)))
+
+
+def _unpack_response(value):
+    size = struct.unpack_from('<I', value)[0]
+    status, content_type, headers = json.loads(value[4:4 + size])
+    response = JsonResponse(value[4 + size:], status, headers, content_type)
+    response._json_unfinished = True
+    return _finish_shared(response)
+
+
+# Helper function to wrap a view with response cache (see @as_json).
+def _cached_view(view, cache):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or current_app.response_class is not Response):
+            return view(*args, **kwargs)
+
+        # The cache may be shared by applications and virtual hosts.
+        app = current_app._get_current_object()
+        key = '%s\n%s\n%s' % (app.import_name, request.host,
+                              request.full_path)
+        mimetype = _negotiate(app)
+        if mimetype is not None:
+            key += '\n' + mimetype
+        value = cache.get(key)
+        if value is not None:
+            return _unpack_response(value)
+
+        response = _call_shared(view, *args, **kwargs)
+        if response.status_code == 200 and response.is_sequence:
+            cache.set(key, _pack_response(response))
+        return _finish_shared(response)
+
+    return wrapper
+
+
+class _Flight(object):
+    """In-flight view call shared by concurrent requests."""
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class _SingleFlight(object):
+    """Registry of in-flight calls, see @as_json(coalesce=...)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    # Returns (flight, True) if the caller must perform the call
+    # or (flight, False) if it should wait for the result.
+    def join(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def finish(self, key, flight, value=None, error=None):
+        with self._lock:
+            del self._flights[key]
+        flight.value = value
+        flight.error = error
+        flight.event.set()
+
+
+# Helper function to wrap a view so concurrent identical requests share
+# a single view call (see @as_json).
+def _coalesced_view(view, headers):
+    flights = _SingleFlight()
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Only safe requests may share the result; bodies of other requests
+        # differ and their side effects must not be dropped.
+        if request.method not in ('GET', 'HEAD'):
+            return view(*args, **kwargs)
+        app = current_app._get_current_object()
+        key = (app, request.method, request.host, request.full_path,
+               _negotiate(app))
+        if headers:
+            key += tuple(request.headers.get(h) for h in headers)
+
+        flight, leader = flights.join(key)
+        if leader:
+            # Full response is shared; conditional and Range headers are
+            # processed for each request.
+            try:
+                response = _call_shared(view, *args, **kwargs)
+            except BaseException as e:
+                flights.finish(key, flight, error=e)
+                raise
+            value = None
+            if response.is_sequence and app.response_class is Response:
+                value = _pack_response(response)
+            flights.finish(key, flight, value)
+            return _finish_shared(response)
+
+        # Call the view if the leader is too slow or it's response can't be
+        # shared (e.g. streamed).
+        if flight.event.wait(app.config['JSON_COALESCE_TIMEOUT']):
+            if flight.error is not None:
+                raise flight.error
+            if flight.value is not None:
+                return _unpack_response(flight.value)
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+# Helper function to start collecting durations of the request processing
+# stages for the Server-Timing header. 'timing' overrides JSON_SERVER_TIMING.
+# Returns list for the (name, duration in ns) pairs or None if timing is
+# disabled. The list is attached to the request, so get_json() can add
+# decode time to it.
+def _start_timing(timing):
+    if timing is None:
+        timing = current_app.config['JSON_SERVER_TIMING']
+    if not timing:
+        return None
+    timings = request._json_timings = []
+    return timings
+
+
+# Helper function to add Server-Timing header with collected durations.
+# Encode time is calculated from the total time if it's not measured
+# directly.
+def _set_server_timing(response, timings, total):
+    durations = {}
+    for name, dur in timings:
+        durations[name] = durations.get(name, 0) + dur
+    if 'encode' not in durations and 'view' in durations:
+        durations['encode'] = total - sum(durations.values()) \
+            + durations.get('decode', 0)
+    durations['total'] = total
+    response.headers.add('Server-Timing', ', '.join(
+        '%s;dur=%.3f' % (name, dur / 1e6) for name, dur in durations.items()))
+
+
+# Helper function to measure the view call for the Server-Timing header.
+def _timed_call(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
-        rv = f(*args, **kwargs)
-        return _build_response(rv)
+        timings = getattr(request, '_json_timings', None)
+        if timings is None:
+            return f(*args, **kwargs)
+        start = _time.perf_counter_ns()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            timings.append(('view', _time.perf_counter_ns() - start))
+    return wrapper
+
+
+# Helper function to add Server-Timing header to the view responses.
+# The view's function must be wrapped with _timed_call().
+def _timed_view(view, timing):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        timings = _start_timing(timing)
+        if timings is None:
+            return view(*args, **kwargs)
+        start = _time.perf_counter_ns()
+        response = view(*args, **kwargs)
+        _set_server_timing(response, timings,
+                           _time.perf_counter_ns() - start)
+        return response
+    return wrapper
+
+
+# Helper function to remove old profiles: only 'keep' recent profiles are
+# left in the directory.
+def _cleanup_profiles(directory, keep):
+    try:
+        names = [x for x in os.listdir(directory) if x.endswith('.prof')]
+    except OSError:
+        return
+    if len(names) <= keep:
+        return
+
+    def mtime(path):
+        # Files may be removed by concurrent cleanups.
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
+
+    paths = [os.path.join(directory, x) for x in names]
+    paths.sort(key=mtime)
+    for path in paths[:len(paths) - keep]:
+        for filename in (path, path[:-5] + '.json'):
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+
+# Helper function to save the view profile with metadata (endpoint, timing,
+# payload size) to the JSON_PROFILE_DIR.
+def _save_profile(profile, config, response, duration, sampled):
+    directory = config['JSON_PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    endpoint = request.endpoint or 'unknown'
+    name = '%d-%s-%d-%d' % (_time.time_ns(),
+                            re.sub(r'[^\w.-]', '_', endpoint),
+                            os.getpid(), threading.get_ident())
+    path = os.path.join(directory, name)
+    profile.dump_stats(path + '.prof')
+
+    meta = {
+        'endpoint': endpoint,
+        'method': request.method,
+        'url': request.full_path,
+        'status': response.status_code,
+        'duration': duration,
+        'payload_size': response.calculate_content_length(),
+        'sampled': sampled,
+        'time': _time.time(),
+    }
+    with open(path + '.json', 'w') as f:
+        json.dump(meta, f)
+    _cleanup_profiles(directory, config['JSON_PROFILE_KEEP'])
+
+
+# Helper function to profile the view with response building.
+# Requests are profiled with JSON_PROFILE_SAMPLE_RATE probability;
+# if JSON_PROFILE_THRESHOLD is set then all requests are profiled but only
+# slow ones are saved.
+def _profiled_view(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        rate = config['JSON_PROFILE_SAMPLE_RATE']
+        threshold = config['JSON_PROFILE_THRESHOLD']
+        sampled = rate > 0 and random.random() < rate
+        if not sampled and threshold is None:
+            return view(*args, **kwargs)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (like sys.monitoring based one).
+            return view(*args, **kwargs)
+        start = _time.perf_counter()
+        try:
+            response = view(*args, **kwargs)
+        finally:
+            profile.disable()
+        duration = _time.perf_counter() - start
+
+        if sampled or duration >= threshold:
+            # Profiling must not break the request.
+            try:
+                _save_profile(profile, config, response, duration, sampled)
+            except Exception:
+                current_app.logger.exception(
+                    'Failed to save JSON profile to %s.',
+                    config['JSON_PROFILE_DIR'])
+        return response
+    return wrapper
+
+
+# Helper function to wrap a view with Server-Timing header and profiler
+# (see _timed_view() and _profiled_view()). Settings are resolved on the
+# first request to the application, so the view is called directly if both
+# are disabled.
+def _diagnosed_view(view, timing):
+    views = WeakKeyDictionary()
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        app = current_app._get_current_object()
+        try:
+            target = views[app]
+        except KeyError:
+            target = views[app] = _diagnostics(app, view, timing)
+        return target(*args, **kwargs)
+
+    return wrapper
+
+
+# Helper function to wrap the view according to the application settings,
+# see _diagnosed_view().
+def _diagnostics(app, view, timing):
+    config = app.config
+    if config['JSON_PROFILE_DIR'] and (
+            config['JSON_PROFILE_SAMPLE_RATE'] > 0
+            or config['JSON_PROFILE_THRESHOLD'] is not None):
+        view = _profiled_view(view)
+    if timing is None:
+        timing = config['JSON_SERVER_TIMING']
+    if timing:
+        view = _timed_view(view, True)
+    return view
+
+
+# Helper function to build ETag value from the view's version key.
+# Request path and response format are taken into account, so different
+# resources and JSON/binary responses have different tags.
+def _version_etag(app, version):
+    value = '%s\n%s\n%s' % (version, request.full_path,
+                            _negotiate(app) or '')
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+# Helper function to wrap a view with version check (see @as_json(etag=)).
+# If the version tag matches If-None-Match then HTTP 304 is returned without
+# calling the view; otherwise the tag is set to the successful response.
+def _versioned_view(view, etag):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(*args, **kwargs)
+        version = etag(**kwargs)
+        if version is None:
+            return view(*args, **kwargs)
+
+        app = current_app._get_current_object()
+        value = _version_etag(app, version)
+        # Compressed responses have content coding in the tag.
+        encodings = app.config['JSON_COMPRESSION']
+        for tag in [value] + ['%s-%s' % (value, e) for e in encodings]:
+            if request.if_none_match.contains_weak(tag):
+                response = app.response_class(status=304)
+                break
+        else:
+            # Range responses use this tag too, see _process_range().
+            request._json_etag = value
+            response = view(*args, **kwargs)
+            if (response.status_code not in (200, 206)
+                    or 'ETag' in response.headers):
+                return response
+            tag = _encoded_etag(value, response)
+        response.set_etag(tag)
+        if app.config['JSON_BINARY_FORMATS']:
+            response.vary.add('Accept')
+        if encodings:
+            response.vary.add('Accept-Encoding')
+        return response
+    return wrapper
 
+
+# Helper function to call async views from sync code.
+def _sync_view(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        return current_app.ensure_sync(f)(*args, **kwargs)
     return wrapper
 
 
+# Allowed JSONP callback names: JavaScript identifiers, optionally dotted
+# (like 'jQuery.callback'). Only ASCII names are allowed, they are written
+# to the body as is.
+_JSONP_CALLBACK_RE = re.compile(
+    r'[A-Za-z_$][A-Za-z0-9_$]*(?:\.[A-Za-z_$][A-Za-z0-9_$]*)*')
+
+
 # Helper function to handle JSONP response.
 # Used in the @as_json_p decorator.
-def _json_p_handler(rv, callbacks=None, optional=None, add_quotes=None):
+# 'timings' is a list to add encode and JSONP wrapping durations to
+# (see _start_timing()).
+def _json_p_handler(rv, callbacks=None, optional=None, add_quotes=None,
+                    timings=None):
     callbacks = callbacks or current_app.config['JSON_JSONP_QUERY_CALLBACKS']
     if optional is None:
         optional = current_app.config['JSON_JSONP_OPTIONAL']
@@ -232,38 +1796,66 @@ def _json_p_handler(rv, callbacks=None, optional=None, add_quotes=None):
         add_quotes = current_app.config['JSON_JSONP_STRING_QUOTES']
 
     callback = None
+    args = request.args
     for k in callbacks:
-        if k in request.args:
-            callback = request.args.get(k)
+        callback = args.get(k)
+        if callback is not None:
             break
 
     if callback is None:
         if optional:
-            return _build_response(rv)
+            if timings is None:
+                return _build_response(rv)
+            start = _time.perf_counter_ns()
+            response = _build_response(rv)
+            timings.append(('encode', _time.perf_counter_ns() - start))
+            return response
         else:
             raise BadRequest('Missing JSONP callback parameter.')
 
+    if _JSONP_CALLBACK_RE.fullmatch(callback) is None:
+        raise BadRequest('Invalid JSONP callback parameter.')
+
     # NOTE: flask 0.11 adds '\n' to the end but we don't need it here.
 
+    if timings is not None:
+        start = _time.perf_counter_ns()
+
     if isinstance(rv, str):
         if rv.endswith('\n'):  # pragma: no cover
             rv = rv[:-1]
         if add_quotes:
-            data = '"%s"' % rv.replace('"', '\\"')
-        else:
-            data = '%s' % rv
+            rv = '"%s"' % rv.replace('"', '\\"')
+        data = rv.encode('utf-8')
     else:
-        data = _build_response(rv, add_status=False).get_data(as_text=True)
-        if data.endswith('\n'):  # pragma: no cover
-            data = data[:-1]
+        # Status and headers are discarded for JSONP.
+        if isinstance(rv, tuple):
+            rv = rv[0]
+        if isinstance(rv, Response):
+            assert current_app.json.mimetype == rv.mimetype
+            data = rv.get_data()
+            if data.endswith(b'\n'):
+                data = data[:-1]
+        else:
+            data = current_app.json.encode({} if rv is None else rv)
+
+    if timings is not None:
+        end = _time.perf_counter_ns()
+        timings.append(('encode', end - start))
+        start = end
 
-    data = str('%s(%s);') % (callback, data)
+    # Payload is not copied: the response body is a sequence of chunks.
+    body = [callback.encode('ascii') + b'(', data, b');']
     response = current_app.response_class(
-        data, status=200, content_type='application/javascript')
+        body, status=200, content_type='application/javascript')
+
+    if timings is not None:
+        timings.append(('jsonp', _time.perf_counter_ns() - start))
     return response
 
 
-def as_json_p(f=None, callbacks=None, optional=None, add_quotes=None):
+def as_json_p(f=None, callbacks=None, optional=None, add_quotes=None,
+              timing=None):
     """This decorator acts like :func:`@as_json <flask_json.as_json>` but
     also handles JSONP requests; expects string or any
     :func:`@as_json <flask_json.as_json>` supported return value.
@@ -308,6 +1900,8 @@ def as_json_p(f=None, callbacks=None, optional=None, add_quotes=None):
             to JSON response.
         add_quotes: If view returns a string then surround it with extra
             quotes.
+        timing: Add ``Server-Timing`` header. If not set then
+            :ref:`JSON_SERVER_TIMING <opt_server_timing>` is used.
 
     Returns:
         flask.Response: JSONP response with javascript function call.
@@ -324,22 +1918,36 @@ def as_json_p(f=None, callbacks=None, optional=None, add_quotes=None):
         :ref:`JSON_JSONP_STRING_QUOTES <opt_jsonp_quotes>`,
         :ref:`JSON_JSONP_OPTIONAL <opt_jsonp_optional>`,
         :ref:`JSON_JSONP_QUERY_CALLBACKS <opt_jsonp_callbacks>`.
+
+    .. versionchanged:: 0.5.0
+       Added ``timing`` parameter.
     """
     if f is None:
-        def deco(func):
-            @wraps(func)
-            def wrapper(*args, **kw):
-                rv = func(*args, **kw)
-                return _json_p_handler(rv, callbacks, optional, add_quotes)
-            return wrapper
-        return deco
+        return partial(as_json_p, callbacks=callbacks, optional=optional,
+                       add_quotes=add_quotes, timing=timing)
 
-    else:
+    if timing is False:
         @wraps(f)
-        def wrapper2(*args, **kw):
+        def wrapper(*args, **kw):
             rv = f(*args, **kw)
             return _json_p_handler(rv, callbacks, optional, add_quotes)
-        return wrapper2
+        return wrapper
+
+    @wraps(f)
+    def timed_wrapper(*args, **kw):
+        timings = _start_timing(timing)
+        if timings is None:
+            rv = f(*args, **kw)
+            return _json_p_handler(rv, callbacks, optional, add_quotes)
+        start = _time.perf_counter_ns()
+        rv = f(*args, **kw)
+        timings.append(('view', _time.perf_counter_ns() - start))
+        response = _json_p_handler(rv, callbacks, optional, add_quotes,
+                                   timings)
+        _set_server_timing(response, timings,
+                           _time.perf_counter_ns() - start)
+        return response
+    return timed_wrapper
 
 
 # TODO: maybe subclass from HTTPException?
@@ -372,6 +1980,275 @@ class JsonError(Exception):
         self.data = kwargs
 
 
+# Regexps and tables used to check JSON structure without parsing.
+# JSON string. The closing quote is optional, so the match never fails once
+# it starts at a quote and every byte is scanned once: unterminated strings
+# (e.g. full of escaped quotes) are consumed to the end in linear time
+# instead of rescanning from every quote.
+_JSON_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\\?\Z)', re.DOTALL)
+_JSON_BRACKET_RUNS_RE = re.compile(rb'\[+|\]+')
+# Arguments for bytes.translate() to keep only brackets, as '[' and ']'.
+_JSON_BRACKETS_TABLE = bytes.maketrans(b'{}', b'[]')
+_JSON_NON_BRACKETS = bytes(range(256)).translate(None, b'[]{}')
+
+
+# Helper function to check depth and (approximate) number of items of the
+# JSON document without parsing it. Strings are stripped in a single linear
+# pass, so commas and brackets inside them are not counted. Depth is
+# checked by runs of brackets and the scan stops as soon as the limit is
+# exceeded.
+def _check_json_structure(data, max_depth, max_items):
+    # Counts with strings included are upper bounds, so most documents
+    # don't need stripping.
+    opened = data.count(b'[') + data.count(b'{')
+    if ((max_items is None or data.count(b',') + opened <= max_items)
+            and (max_depth is None or opened <= max_depth)):
+        return
+
+    data = _JSON_STRING_RE.sub(b'', data)
+    opened = data.count(b'[') + data.count(b'{')
+    if max_items is not None and data.count(b',') + opened > max_items:
+        raise JsonError(description='Too many items in the request JSON.')
+    if max_depth is None or opened <= max_depth:
+        return
+    data = data.translate(_JSON_BRACKETS_TABLE, _JSON_NON_BRACKETS)
+    depth = 0
+    for m in _JSON_BRACKET_RUNS_RE.finditer(data):
+        if data[m.start()] == 0x5b:  # '['
+            depth += m.end() - m.start()
+            if depth > max_depth:
+                raise JsonError(
+                    description='Request JSON is too deeply nested.')
+        else:
+            depth -= m.end() - m.start()
+
+
+# Supported request Content-Encoding values; see JSON_DECOMPRESS_REQUESTS.
+_request_encodings = {'gzip', 'x-gzip', 'deflate'}
+if zstandard is not None:
+    _request_encodings.add('zstd')
+
+
+# Helper function to decompress the stream by chunks.
+# Raises ValueError on invalid data.
+def _iter_decompressed(stream, encoding):
+    if encoding == 'zstd':
+        reader = zstandard.ZstdDecompressor().stream_reader(stream)
+        try:
+            while True:
+                chunk = reader.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        except zstandard.ZstdError as e:
+            raise ValueError(str(e))
+        return
+
+    # Both gzip and zlib (deflate) headers are detected.
+    decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+    try:
+        while True:
+            data = stream.read(_CHUNK_SIZE)
+            if not data:
+                break
+            while data:
+                yield decompressor.decompress(data, _CHUNK_SIZE)
+                data = decompressor.unconsumed_tail
+        yield decompressor.flush()
+    except zlib.error as e:
+        raise ValueError(str(e))
+    if not decompressor.eof:
+        raise ValueError('Compressed data is truncated.')
+
+
+# Whitespaces between JSON tokens, used by LazyJSON.
+_JSON_WS_RE = re.compile(r'[ \t\n\r]*')
+
+# Decoder used by LazyJSON to skip values. C scanner is much faster than
+# any Python-level skipping; skipped values are discarded at once.
+_json_skipper = json.JSONDecoder()
+
+
+# Helper function to find end of the JSON value which starts at 'pos'.
+def _skip_json_value(text, pos):
+    c = text[pos:pos + 1]
+    if c == '"':
+        return scanstring(text, pos + 1)[1]
+    return _json_skipper.raw_decode(text, pos)[1]
+
+
+class LazyJSON(Mapping):
+    """Read-only lazy view of the JSON object.
+
+    Top-level keys are scanned on demand (up to the requested key) and
+    values are skipped without keeping them; a value is parsed only when
+    it's accessed. Nested objects are
+    returned as :class:`LazyJSON` too. Raw JSON is available in
+    :attr:`raw`, so the document may be forwarded without re-serialization::
+
+        doc = LazyJSON(b'{"type": "event", "payload": {...}}')
+        if doc['type'] == 'event':
+            forward(doc.raw)
+
+    Document is validated only partially: invalid values are detected when
+    they are scanned or accessed. Duplicate keys are rejected when they are
+    scanned (:func:`json.loads` would silently keep the last value).
+
+    Usually it's created by :meth:`.FlaskJSONRequest.get_json_lazy`.
+
+    .. versionadded:: 0.5.0
+    """
+    def __init__(self, data, loads=None, on_error=None):
+        """Construct lazy view.
+
+        Args:
+            data: JSON object text (:class:`str` or UTF-8 :class:`bytes`).
+            loads: Function to parse values, :func:`json.loads` by default.
+            on_error: Function to call with :class:`ValueError` on invalid
+                JSON; the error is raised if the function returns.
+
+        Raises:
+            ValueError: if data is not a JSON object.
+        """
+        if isinstance(data, bytes):
+            self._raw = data
+            data = data.decode('utf-8')
+        else:
+            self._raw = None
+        start = _JSON_WS_RE.match(data).end()
+        end = len(data.rstrip(' \t\n\r'))
+        if data[start:start + 1] != '{' or data[end - 1:end] != '}':
+            raise ValueError('Not a JSON object.')
+        self._setup(data, start, end, loads or json.loads, on_error)
+
+    def _setup(self, text, start, end, loads, on_error):
+        self._text = text
+        self._start = start
+        self._end = end
+        self._loads = loads
+        self._on_error = on_error
+        # Scan position and state.
+        self._pos = start + 1
+        self._done = False
+        # Keys in order, key -> (start, end) of the value and parsed values.
+        self._keys = []
+        self._spans = {}
+        self._values = {}
+
+    def _error(self, e):
+        if self._on_error is not None:
+            self._on_error(e)
+        raise e
+
+    # Scans next key; returns False if there are no more keys.
+    def _scan(self):
+        if self._done:
+            return False
+        text = self._text
+        try:
+            pos = _JSON_WS_RE.match(text, self._pos).end()
+            c = text[pos:pos + 1]
+            if c == '}':
+                self._done = True
+                return False
+            if self._keys:
+                if c != ',':
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", text, pos)
+                pos = _JSON_WS_RE.match(text, pos + 1).end()
+            if text[pos:pos + 1] != '"':
+                raise json.JSONDecodeError(
+                    'Expecting property name enclosed in double quotes',
+                    text, pos)
+            key, pos = scanstring(text, pos + 1)
+            pos = _JSON_WS_RE.match(text, pos).end()
+            if text[pos:pos + 1] != ':':
+                raise json.JSONDecodeError(
+                    "Expecting ':' delimiter", text, pos)
+            pos = _JSON_WS_RE.match(text, pos + 1).end()
+            end = _skip_json_value(text, pos)
+        except ValueError as e:
+            self._done = True
+            self._error(e)
+        if key in self._spans:
+            self._done = True
+            self._error(ValueError('Duplicate key: %r.' % key))
+        self._keys.append(key)
+        self._spans[key] = (pos, end)
+        self._pos = end
+        return True
+
+    def _scan_all(self):
+        while self._scan():
+            pass
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        while key not in self._spans:
+            if not self._scan():
+                raise KeyError(key)
+        start, end = self._spans[key]
+        if self._text[start] == '{':
+            value = LazyJSON.__new__(LazyJSON)
+            value._raw = None
+            value._setup(self._text, start, end, self._loads, self._on_error)
+        else:
+            # Value is parsed as a member of an object, so object hooks
+            # (like datetime values decoding by keys) get the same input
+            # as with full parsing.
+            text = '{%s:%s}' % (json.dumps(key), self._text[start:end])
+            try:
+                value = self._loads(text)[key]
+            except ValueError as e:
+                self._error(e)
+        self._values[key] = value
+        return value
+
+    def __contains__(self, key):
+        while key not in self._spans:
+            if not self._scan():
+                return False
+        return True
+
+    def __iter__(self):
+        keys = self._keys
+        i = 0
+        while True:
+            if i < len(keys):
+                yield keys[i]
+                i += 1
+            elif not self._scan():
+                return
+
+    def __len__(self):
+        self._scan_all()
+        return len(self._keys)
+
+    def __repr__(self):
+        return '<LazyJSON %d bytes>' % (self._end - self._start)
+
+    @property
+    def raw(self):
+        """bytes: Raw JSON of the object."""
+        if self._raw is None:
+            self._raw = self._text[self._start:self._end].encode('utf-8')
+        return self._raw
+
+    def load(self):
+        """Parse the whole object.
+
+        Returns:
+            dict: Parsed object.
+        """
+        try:
+            return self._loads(self._text[self._start:self._end])
+        except ValueError as e:
+            self._error(e)
+
+
 class FlaskJSONRequest(Request):
     """This class changes :class:`flask.Request` behaviour on JSON parse
     errors.
@@ -379,10 +2256,199 @@ class FlaskJSONRequest(Request):
     :meth:`flask.Request.get_json` will raise :class:`.JsonError`
     by default on invalid JSON content.
 
+    Also it parses MessagePack and CBOR requests if they are enabled by
+    :ref:`JSON_BINARY_FORMATS <opt_binary_formats>`.
+
+    Compressed requests are supported too, see
+    :ref:`JSON_DECOMPRESS_REQUESTS <opt_decompress_requests>`.
+
+    Requests may be limited by size, depth and number of items, see
+    :ref:`JSON_MAX_REQUEST_BYTES <opt_max_request_bytes>`,
+    :ref:`JSON_MAX_DEPTH <opt_max_depth>` and
+    :ref:`JSON_MAX_ITEMS <opt_max_items>`.
+
     See Also:
         :ref:`JSON_DECODE_ERROR_MESSAGE <opt_decode_error_msg>`,
         :meth:`@invalid_json_error <.FlaskJSON.invalid_json_error>`
     """
+    def get_json(self, force=False, silent=False, cache=True):
+        """Parse request data as JSON.
+
+        Same as :meth:`flask.Request.get_json` but also supports
+        binary formats enabled by
+        :ref:`JSON_BINARY_FORMATS <opt_binary_formats>`.
+
+        Decode time is added to the ``Server-Timing`` header if it's
+        enabled, see :ref:`JSON_SERVER_TIMING <opt_server_timing>`.
+        """
+        timings = getattr(self, '_json_timings', None)
+        if timings is None:
+            return self._get_json(force, silent, cache)
+        start = _time.perf_counter_ns()
+        rv = self._get_json(force, silent, cache)
+        # Skip requests without JSON.
+        if rv is not None:
+            timings.append(('decode', _time.perf_counter_ns() - start))
+        return rv
+
+    def _get_json(self, force, silent, cache):
+        config = current_app.config
+        formats = config['JSON_BINARY_FORMATS']
+        binary = bool(formats) and self.mimetype in formats
+        if force or binary or self.is_json:
+            try:
+                self._decompress(config)
+            except ValueError as e:
+                if silent:
+                    return None
+                return self.on_json_loading_failed(e)
+            self._check_limits(config, binary)
+        if not binary:
+            return super(FlaskJSONRequest, self).get_json(force, silent, cache)
+
+        if cache and self._cached_json[silent] is not Ellipsis:
+            return self._cached_json[silent]
+
+        data = self.get_data(cache=cache)
+        try:
+            rv = current_app.json.loads_binary(data, self.mimetype)
+        except Exception as e:
+            if silent:
+                rv = None
+                if cache:
+                    self._cached_json = (self._cached_json[0], rv)
+            else:
+                rv = self.on_json_loading_failed(e)
+                if cache:
+                    self._cached_json = (rv, self._cached_json[1])
+        else:
+            if cache:
+                self._cached_json = (rv, rv)
+        return rv
+
+    def get_json_lazy(self, force=False):
+        """Get lazy view of the request JSON object.
+
+        Only accessed values are parsed, which is faster for large requests
+        if a view reads few top-level fields. Raw request JSON is available
+        in :attr:`.LazyJSON.raw`::
+
+            doc = request.get_json_lazy()
+            if doc['type'] == 'event':
+                send(doc.raw)
+
+        If the document is not a JSON object (or it's a binary format) then
+        it's parsed with :meth:`get_json`. Invalid values are handled in
+        the same way as invalid JSON when they are accessed.
+
+        Args:
+            force: Ignore the mimetype and always try to parse JSON.
+
+        Returns:
+            LazyJSON: Lazy view of the request JSON or parsed JSON if it's
+            not an object.
+
+        .. versionadded:: 0.5.0
+        """
+        rv = getattr(self, '_lazy_json', None)
+        if rv is not None:
+            return rv
+        config = current_app.config
+        formats = config['JSON_BINARY_FORMATS']
+        if (not (force or self.is_json)
+                or (formats and self.mimetype in formats)):
+            return self.get_json(force=force)
+
+        try:
+            self._decompress(config)
+        except ValueError as e:
+            return self.on_json_loading_failed(e)
+        self._check_limits(config, False)
+        try:
+            rv = LazyJSON(self.get_data(), current_app.json.loads,
+                          self.on_json_loading_failed)
+        except ValueError:
+            rv = self.get_json(force=True)
+        self._lazy_json = rv
+        return rv
+
+    # Decompresses request body if it's compressed (Content-Encoding) and
+    # JSON_DECOMPRESS_REQUESTS is enabled. Decompressed body is cached like
+    # in get_data(). Raises 413 error if the body is larger than
+    # JSON_MAX_DECOMPRESSED_SIZE or ValueError if it's invalid.
+    def _decompress(self, config):
+        encoding = self.content_encoding
+        if not encoding or not config['JSON_DECOMPRESS_REQUESTS'] \
+                or getattr(self, '_json_decompressed', False):
+            return
+        encoding = encoding.strip().lower()
+        if encoding == 'identity':
+            return
+        if encoding not in _request_encodings:
+            raise JsonError(status_=415,
+                            description='Unsupported Content-Encoding.')
+
+        data = getattr(self, '_cached_data', None)
+        stream = self.stream if data is None else BytesIO(data)
+        max_bytes = config['JSON_MAX_DECOMPRESSED_SIZE']
+        chunks = []
+        size = 0
+        for chunk in _iter_decompressed(stream, encoding):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise JsonError(status_=413,
+                                description='Request is too large.')
+            chunks.append(chunk)
+        self._cached_data = b''.join(chunks)
+        self._json_decompressed = True
+
+    # Checks request size, depth and number of items before parsing; see
+    # JSON_MAX_REQUEST_BYTES, JSON_MAX_DEPTH and JSON_MAX_ITEMS.
+    # Structure of binary formats is not checked.
+    def _check_limits(self, config, binary):
+        if getattr(self, '_json_limits_checked', False):
+            return
+        max_bytes = config['JSON_MAX_REQUEST_BYTES']
+        max_depth = config['JSON_MAX_DEPTH']
+        max_items = config['JSON_MAX_ITEMS']
+        if max_bytes is not None:
+            data = self._read_limited(max_bytes)
+        elif binary or (max_depth is None and max_items is None):
+            return
+        else:
+            data = self.get_data()
+        if not binary and (max_depth is not None or max_items is not None):
+            _check_json_structure(data, max_depth, max_items)
+        self._json_limits_checked = True
+
+    # Reads request body limited by 'max_bytes': Content-Length is checked
+    # up front and the stream is read by chunks, so oversized bodies are
+    # rejected without reading them fully. The body is cached like in
+    # get_data().
+    def _read_limited(self, max_bytes):
+        length = self.content_length
+        if length is not None and length > max_bytes \
+                and not getattr(self, '_json_decompressed', False):
+            raise JsonError(status_=413, description='Request is too large.')
+        data = getattr(self, '_cached_data', None)
+        if data is None:
+            chunks = []
+            size = 0
+            stream = self.stream
+            while True:
+                chunk = stream.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise JsonError(status_=413,
+                                    description='Request is too large.')
+                chunks.append(chunk)
+            data = self._cached_data = b''.join(chunks)
+        elif len(data) > max_bytes:
+            raise JsonError(status_=413, description='Request is too large.')
+        return data
+
     def on_json_loading_failed(self, e):
         # Try decoder error hook firstly; see FlaskJSON.invalid_json_error().
         func = current_app.extensions['json']._decoder_error_func
@@ -424,6 +2490,38 @@ class FlaskJSON(object):
         app.config.setdefault('JSON_ADD_STATUS', True)
         app.config.setdefault('JSON_STATUS_FIELD_NAME', 'status')
         app.config.setdefault('JSON_DECODE_ERROR_MESSAGE', 'Not a JSON.')
+        app.config.setdefault('JSON_ACCEPT_RANGES', False)
+        formats = app.config.setdefault('JSON_BINARY_FORMATS', [])
+        for mimetype in formats:
+            if mimetype not in _binary_formats:
+                raise ValueError('Unsupported binary format %s' % mimetype)
+        app.config.setdefault('JSON_COALESCE_TIMEOUT', 30)
+        app.config.setdefault('JSON_PAGINATION_LIMIT', 20)
+        app.config.setdefault('JSON_PAGINATION_MAX_LIMIT', 100)
+        app.config.setdefault('JSON_FLOAT_PRECISION', None)
+        app.config.setdefault('JSON_ENCODE_MEMO', False)
+        app.config.setdefault('JSON_SERVER_TIMING', False)
+        app.config.setdefault('JSON_PROFILE_DIR', None)
+        app.config.setdefault('JSON_PROFILE_SAMPLE_RATE', 0.0)
+        app.config.setdefault('JSON_PROFILE_THRESHOLD', None)
+        app.config.setdefault('JSON_PROFILE_KEEP', 100)
+        app.config.setdefault('JSON_KEY_PATH_STATS', False)
+        app.config.setdefault('JSON_TRACE_MEMORY', False)
+        app.config.setdefault('JSON_MEMORY_LOG_THRESHOLD', None)
+        app.config.setdefault('JSON_MEMORY_LIMIT', None)
+        app.config.setdefault('JSON_MAX_REQUEST_BYTES', None)
+        app.config.setdefault('JSON_MAX_DEPTH', None)
+        app.config.setdefault('JSON_MAX_ITEMS', None)
+        app.config.setdefault('JSON_DECOMPRESS_REQUESTS', False)
+        app.config.setdefault('JSON_DECODE_DATETIME', False)
+        app.config.setdefault('JSON_DECODE_DATETIME_KEYS', None)
+        app.config.setdefault('JSON_MAX_DECOMPRESSED_SIZE', 16 * 1024 * 1024)
+        encodings = app.config.setdefault('JSON_COMPRESSION', [])
+        for encoding in encodings:
+            if encoding not in _compressions:
+                raise ValueError('Unsupported compression %s' % encoding)
+        app.config.setdefault('JSON_COMPRESSION_MIN_SIZE', 1024)
+        app.config.setdefault('JSON_COMPRESSION_MEMO_SIZE', 16 * 1024 * 1024)
         jsonify_errors = app.config.setdefault(
             'JSON_JSONIFY_HTTP_ERRORS', False)
 
@@ -591,6 +2689,268 @@ def _encoder(o):
         return m()
 
 
+# Helper function to parse ISO 8601 datetime, date or time string.
+# Cheap length and delimiters checks are done before parsing, so most of
+# other strings are rejected without exceptions. Returns None if the string
+# is not a datetime.
+def _parse_iso_datetime(s):
+    n = len(s)
+    if n < 5 or n > 32 or not s[0].isdigit():
+        return None
+    try:
+        if s[4:5] == '-' and s[7:8] == '-':
+            if n == 10:
+                return date.fromisoformat(s)
+            elif n >= 16 and s[10] in 'T ':
+                # fromisoformat() supports 'Z' suffix only since Python 3.11.
+                if s[-1] == 'Z':
+                    s = s[:-1] + '+00:00'
+                return datetime.fromisoformat(s)
+        elif s[2] == ':' and n <= 21:
+            if s[-1] == 'Z':
+                s = s[:-1] + '+00:00'
+            return time.fromisoformat(s)
+    except ValueError:
+        pass
+    return None
+
+
+# JSON object hook to convert ISO 8601 strings to datetime, date and time
+# values; 'keys' is a set of key names to check or None to check all keys.
+# Strings in lists (including nested ones) under the keys are converted too.
+def _decode_datetimes(keys, obj):
+    for key, value in obj.items():
+        if keys is not None and key not in keys:
+            continue
+        if type(value) is str:
+            value = _parse_iso_datetime(value)
+            if value is not None:
+                obj[key] = value
+        elif type(value) is list:
+            _decode_datetime_list(value)
+    return obj
+
+
+# Helper function to convert ISO 8601 strings in the list (and nested lists)
+# in place. Objects are converted by _decode_datetimes() hook.
+def _decode_datetime_list(items):
+    for index, value in enumerate(items):
+        if type(value) is str:
+            value = _parse_iso_datetime(value)
+            if value is not None:
+                items[index] = value
+        elif type(value) is list:
+            _decode_datetime_list(value)
+    return items
+
+
+# Helper function to convert dict key to string in the same way
+# as JSON encoder does (1 -> '1', True -> 'true', None -> 'null').
+def _json_key(key):
+    return key if isinstance(key, str) else json.dumps(key)
+
+
+# Helper function to encode data by chunks with the given encoder: lists and
+# dicts of the top 'depth' levels are split by items, other values are
+# encoded at once (by the C encoder if available). Output is the same as
+# encoder.encode() gives; used to check memory while encoding.
+def _iterencode_split(encoder, obj, depth):
+    if not depth or not isinstance(obj, (list, tuple, dict)) or not obj:
+        yield encoder.encode(obj)
+        return
+
+    item_separator = encoder.item_separator
+    if isinstance(obj, dict):
+        items = obj.items()
+        if encoder.sort_keys:
+            items = sorted(items, key=itemgetter(0))
+        first = True
+        yield '{'
+        for key, value in items:
+            if not isinstance(key, str):
+                if key is not None and not isinstance(key, (int, float)):
+                    if encoder.skipkeys:
+                        continue
+                    raise TypeError('keys must be str, int, float, bool or '
+                                    'None, not %s' % type(key).__name__)
+                key = encoder.encode(key)
+            if not first:
+                yield item_separator
+            first = False
+            yield encoder.encode(key)
+            yield encoder.key_separator
+            for chunk in _iterencode_split(encoder, value, depth - 1):
+                yield chunk
+        yield '}'
+    else:
+        yield '['
+        for index, value in enumerate(obj):
+            if index:
+                yield item_separator
+            for chunk in _iterencode_split(encoder, value, depth - 1):
+                yield chunk
+        yield ']'
+
+
+# Helper function to round floats in the numpy array to the given number of
+# significant digits. Values are rounded in bulk as k / 10^m (or k * 10^m)
+# which gives shortest float representation. Returns list.
+def _round_array(a, digits):
+    if a.dtype.kind != 'f':
+        return a.tolist()
+    a = a.astype(numpy.float64)
+    with numpy.errstate(all='ignore'):
+        exp = digits - 1 - numpy.floor(numpy.log10(numpy.abs(a)))
+        # Zeros, inf, nan and too small/large values are kept as is.
+        ok = numpy.isfinite(exp) & (numpy.abs(exp) < 300)
+        exp = numpy.where(ok, exp, 0)
+        scale = 10.0 ** numpy.abs(exp)
+        up = exp >= 0
+        k = numpy.round(numpy.where(up, a * scale, a / scale))
+        a = numpy.where(ok, numpy.where(up, k / scale, k * scale), a)
+    return a.tolist()
+
+
+# Helper function to round floats in the data to the given number of
+# significant digits. Containers are copied, other values are kept as is.
+def _round_floats(obj, digits):
+    if isinstance(obj, float):
+        return float('%.*g' % (digits, obj))
+    elif isinstance(obj, dict):
+        return {k: _round_floats(v, digits) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [_round_floats(x, digits) for x in obj]
+    elif numpy is not None and isinstance(obj, numpy.ndarray):
+        return _round_array(obj, digits)
+    return obj
+
+
+# Helper function to wrap encoder function with memo of its results by
+# object identity. Objects are kept in the memo, so their ids are not reused
+# while the memo is alive (one serialization).
+def _memoize(default):
+    memo = {}
+
+    def wrapper(o):
+        try:
+            return memo[id(o)][1]
+        except KeyError:
+            val = default(o)
+            memo[id(o)] = (o, val)
+            return val
+    return wrapper
+
+
+# Python JSON encoder which attributes encode time and output size to the
+# key paths like 'items[*].owner.name' (inclusive, nested values are
+# counted in the parent's path too). Output is the same as json.dumps()
+# with the same arguments. Used by FlaskJSONProvider if
+# JSON_KEY_PATH_STATS is enabled.
+class _KeyPathEncoder(object):
+    def __init__(self, default, sort_keys=False, ensure_ascii=True,
+                 indent=None, separators=None):
+        self.default = default
+        self.sort_keys = sort_keys
+        if isinstance(indent, int):
+            indent = ' ' * indent
+        self.indent = indent
+        if separators is None:
+            separators = (', ', ': ') if indent is None else (',', ': ')
+        self.item_separator, self.key_separator = separators
+        self.encode_scalar = json.JSONEncoder(ensure_ascii=ensure_ascii).encode
+        # Key path -> [count, time in ns, size].
+        self.stats = {}
+        self._out = []
+        self._size = 0
+
+    def encode(self, obj):
+        self._encode(obj, '', 0)
+        return ''.join(self._out)
+
+    def _write(self, text):
+        self._out.append(text)
+        self._size += len(text)
+
+    def _encode(self, o, path, level):
+        if not path:
+            return self._encode_value(o, path, level)
+        start = _time.perf_counter_ns()
+        size = self._size
+        self._encode_value(o, path, level)
+        stats = self.stats.get(path)
+        if stats is None:
+            stats = self.stats[path] = [0, 0, 0]
+        stats[0] += 1
+        stats[1] += _time.perf_counter_ns() - start
+        stats[2] += self._size - size
+
+    def _encode_value(self, o, path, level):
+        if o is None or isinstance(o, (str, int, float)):
+            self._write(self.encode_scalar(o))
+        elif isinstance(o, dict):
+            self._encode_dict(o, path, level)
+        elif isinstance(o, (list, tuple)):
+            self._encode_list(o, path, level)
+        else:
+            self._encode_value(self.default(o), path, level)
+
+    # Returns separator between items and writes opening of the container.
+    def _open(self, bracket, level):
+        self._write(bracket)
+        if self.indent is None:
+            return self.item_separator
+        newline = '\n' + self.indent * (level + 1)
+        self._write(newline)
+        return self.item_separator + newline
+
+    def _close(self, bracket, level):
+        if self.indent is not None:
+            self._write('\n' + self.indent * level)
+        self._write(bracket)
+
+    def _encode_dict(self, o, path, level):
+        if not o:
+            return self._write('{}')
+        items = o.items()
+        if self.sort_keys:
+            try:
+                items = sorted(items, key=itemgetter(0))
+            except TypeError:
+                items = sorted(items, key=lambda x: _json_key(x[0]))
+        separator = self._open('{', level)
+        prefix = path + '.' if path else ''
+        first = True
+        for key, value in items:
+            if first:
+                first = False
+            else:
+                self._write(separator)
+            key = _json_key(key)
+            self._write(self.encode_scalar(key))
+            self._write(self.key_separator)
+            self._encode(value, prefix + key, level + 1)
+        self._close('}', level)
+
+    def _encode_list(self, o, path, level):
+        if not o:
+            return self._write('[]')
+        separator = self._open('[', level)
+        path += '[*]'
+        first = True
+        for value in o:
+            if first:
+                first = False
+            else:
+                self._write(separator)
+            self._encode(value, path, level + 1)
+        self._close(']', level)
+
+
+# Helper function to round floats in the value returned by the encoder.
+def _round_default(default, digits, o):
+    return _round_floats(default(o), digits)
+
+
 class FlaskJSONProvider(DefaultJSONProvider):
     """Extends default Flask JSON provider with more types.
 
@@ -603,6 +2963,22 @@ class FlaskJSONProvider(DefaultJSONProvider):
 
     Time related values will be converted to ISO 8601 format by default.
 
+    If keys sorting is enabled then dictionaries with mixed key types
+    (like numeric keys and string status field) are supported too.
+
+    Floats may be rounded to the given number of significant digits,
+    see :ref:`JSON_FLOAT_PRECISION <opt_float_precision>`.
+
+    Results of the encoders may be reused for the same objects within one
+    serialization, see :ref:`JSON_ENCODE_MEMO <opt_encode_memo>`.
+
+    ISO 8601 strings may be decoded to datetime values, see
+    :ref:`JSON_DECODE_DATETIME <opt_decode_datetime>`.
+
+    Encode cost may be attributed to the key paths for diagnostics, see
+    :ref:`JSON_KEY_PATH_STATS <opt_key_path_stats>` and
+    :meth:`key_path_report`.
+
     See Also:
         :ref:`JSON_DATETIME_FORMAT <opt_fmt_datetime>`,
         :ref:`JSON_DATE_FORMAT <opt_fmt_date>`,
@@ -619,6 +2995,374 @@ class FlaskJSONProvider(DefaultJSONProvider):
         # NOTE: flask's converter raises an error, so this line is unreachable.
         raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")  # pragma: no cover
 
+    # Maximum number of cached key orders, see _normalize_keys().
+    key_orders_limit = 1024
+
+    # Maximum number of key paths per endpoint, see key_path_report().
+    key_paths_limit = 1024
+
+    # Number of top levels of lists and dicts which are encoded item by item
+    # to check memory between items, see JSON_MEMORY_LIMIT. Items are
+    # encoded with the fast C encoder.
+    memory_split_depth = 2
+
+    def __init__(self, app):
+        super(FlaskJSONProvider, self).__init__(app)
+        # Sorted key order per dict key set: frozenset -> ((json key, key),).
+        self._key_orders = {}
+        # Key path stats: endpoint -> {path: [count, time in ns, size]}.
+        self._key_paths = {}
+        self._key_paths_lock = threading.Lock()
+        # Compressed bodies: (body digest, encoding) -> compressed body.
+        self._compressed = OrderedDict()
+        self._compressed_size = 0
+        self._compressed_hits = 0
+        self._compressed_misses = 0
+        self._compressed_lock = threading.Lock()
+
+    def dumps(self, obj, float_precision=None, **kwargs):
+        """Serialize data as JSON.
+
+        Same as :meth:`flask.json.provider.DefaultJSONProvider.dumps` but
+        also supports sorting of dictionaries with mixed key types.
+
+        Args:
+            obj: Data to serialize.
+            float_precision: Number of significant digits for floats.
+                If not set then
+                :ref:`JSON_FLOAT_PRECISION <opt_float_precision>` is used,
+                ``0`` disables rounding.
+            kwargs: :func:`json.dumps` arguments.
+
+        .. versionchanged:: 0.5.0
+           Added ``float_precision``.
+        """
+        obj, kwargs = self._wrap_default(obj, float_precision, kwargs)
+        if self._app.config.get('JSON_KEY_PATH_STATS'):
+            return self._dumps_with_stats(obj, **kwargs)
+        if not kwargs.get('sort_keys', self.sort_keys):
+            return self._dumps(obj, **kwargs)
+
+        # Dicts with mixed key types may be anywhere (including values
+        # returned by default()), so if encoding fails then it's retried
+        # with normalized keys. Values of iterators (like generators) can be
+        # got only once, so they are remembered for the retry.
+        default = kwargs.get('default', self.default)
+        iterated = {}
+
+        def remember(o):
+            value = default(o)
+            if isinstance(o, Iterator):
+                iterated[id(o)] = (o, value)
+            return value
+
+        def normalize(o):
+            entry = iterated.get(id(o))
+            return self._normalize_keys(default(o) if entry is None
+                                        else entry[1])
+
+        kwargs['default'] = remember
+        try:
+            return self._dumps(obj, **kwargs)
+        except TypeError:
+            pass
+        kwargs['default'] = normalize
+        return self._dumps(self._normalize_keys(obj), **kwargs)
+
+    # Serializes data; if JSON_MEMORY_LIMIT is set then data is encoded by
+    # chunks and encoding is aborted with HTTP 507 error if memory used by
+    # the encoded chunks (and then by the joined result) exceeds the limit.
+    # The check is done after each chunk, so the limit is approximate: items
+    # below memory_split_depth are encoded at once. Only this encoding is
+    # accounted, so other threads don't affect it.
+    def _dumps(self, obj, **kwargs):
+        limit = self._app.config.get('JSON_MEMORY_LIMIT')
+        if not limit:
+            return super(FlaskJSONProvider, self).dumps(obj, **kwargs)
+
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        encoder = json.JSONEncoder(**kwargs)
+        # Indented output is not supported by the C encoder anyway.
+        if encoder.indent is not None:
+            chunks = encoder.iterencode(obj)
+        else:
+            chunks = _iterencode_split(encoder, obj, self.memory_split_depth)
+
+        result = []
+        size = length = 0
+        for chunk in chunks:
+            size += sys.getsizeof(chunk)
+            length += len(chunk)
+            if size > limit:
+                break
+            result.append(chunk)
+        # Chunks are kept until they are joined.
+        if size + length > limit:
+            del result
+            raise JsonError(status_=507,
+                            description='Response exceeds memory limit.')
+        return ''.join(result)
+
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON.
+
+        Same as :meth:`flask.json.provider.DefaultJSONProvider.loads` but
+        also converts ISO 8601 strings to :class:`~datetime.datetime`,
+        :class:`~datetime.date` and :class:`~datetime.time` values if
+        :ref:`JSON_DECODE_DATETIME <opt_decode_datetime>` is enabled.
+
+        .. versionadded:: 0.5.0
+        """
+        config = self._app.config
+        if config.get('JSON_DECODE_DATETIME') \
+                and 'object_hook' not in kwargs \
+                and 'object_pairs_hook' not in kwargs:
+            keys = config.get('JSON_DECODE_DATETIME_KEYS')
+            if keys is not None:
+                keys = frozenset(keys)
+            kwargs['object_hook'] = partial(_decode_datetimes, keys)
+            rv = super(FlaskJSONProvider, self).loads(s, **kwargs)
+            # Top level values are not under any key.
+            if keys is None:
+                if type(rv) is str:
+                    value = _parse_iso_datetime(rv)
+                    return rv if value is None else value
+                elif type(rv) is list:
+                    return _decode_datetime_list(rv)
+            return rv
+        return super(FlaskJSONProvider, self).loads(s, **kwargs)
+
+    # Serializes data with key path stats collecting; see _KeyPathEncoder.
+    def _dumps_with_stats(self, obj, default=None, sort_keys=None,
+                          ensure_ascii=None, indent=None, separators=None,
+                          **kwargs):
+        encoder = _KeyPathEncoder(
+            default or self.default,
+            self.sort_keys if sort_keys is None else sort_keys,
+            self.ensure_ascii if ensure_ascii is None else ensure_ascii,
+            indent, separators)
+        text = encoder.encode(obj)
+
+        endpoint = request.endpoint if has_request_context() else None
+        with self._key_paths_lock:
+            paths = self._key_paths.setdefault(endpoint, {})
+            for path, (count, ns, size) in encoder.stats.items():
+                stats = paths.get(path)
+                if stats is None:
+                    if len(paths) >= self.key_paths_limit:
+                        continue
+                    stats = paths[path] = [0, 0, 0]
+                stats[0] += count
+                stats[1] += ns
+                stats[2] += size
+        return text
+
+    def key_path_report(self, endpoint=None, reset=False):
+        """Get encode cost per JSON key path collected while
+        :ref:`JSON_KEY_PATH_STATS <opt_key_path_stats>` is enabled.
+
+        Paths look like ``items[*].owner.avatar`` (``[*]`` means any list
+        item). Time and size of nested values are included in the parent
+        path.
+
+        Args:
+            endpoint: Return report only for the given endpoint.
+            reset: Clear collected stats.
+
+        Returns:
+            dict: Endpoint (``None`` for serializations outside of requests)
+            to the list of dicts with ``path``, ``count``, ``time``
+            (seconds) and ``size`` (characters), the most expensive paths
+            go first. If ``endpoint`` is set then only the list is returned.
+
+        .. versionadded:: 0.5.0
+        """
+        with self._key_paths_lock:
+            report = {}
+            for name, paths in self._key_paths.items():
+                items = [dict(path=path, count=count, time=ns / 1e9,
+                              size=size)
+                         for path, (count, ns, size) in paths.items()]
+                items.sort(key=lambda x: x['time'], reverse=True)
+                report[name] = items
+            if reset:
+                self._key_paths.clear()
+        if endpoint is not None:
+            return report.get(endpoint, [])
+        return report
+
+    def compress(self, data, encoding):
+        """Compress encoded response body.
+
+        Compressed bodies are kept in the memo limited by
+        :ref:`JSON_COMPRESSION_MEMO_SIZE <opt_compression_memo_size>`,
+        so recurring bodies are not compressed again. Least recently used
+        bodies are evicted firstly.
+
+        Args:
+            data: Body bytes.
+            encoding: Content coding: ``gzip``, ``br`` (requires
+                ``brotli``) or ``zstd`` (requires ``zstandard``).
+
+        Returns:
+            bytes: Compressed data.
+
+        .. versionadded:: 0.5.0
+        """
+        compress = _compressions[encoding]
+        limit = self._app.config.get('JSON_COMPRESSION_MEMO_SIZE')
+        if not limit:
+            return compress(data)
+
+        key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+        with self._compressed_lock:
+            value = self._compressed.get(key)
+            if value is not None:
+                self._compressed.move_to_end(key)
+                self._compressed_hits += 1
+                return value
+            self._compressed_misses += 1
+
+        value = compress(data)
+        if len(value) > limit:
+            return value
+        with self._compressed_lock:
+            if key not in self._compressed:
+                self._compressed[key] = value
+                self._compressed_size += len(value)
+                while self._compressed_size > limit:
+                    _, old = self._compressed.popitem(last=False)
+                    self._compressed_size -= len(old)
+        return value
+
+    def compression_stats(self, reset=False):
+        """Get compressed bodies memo statistics, see :meth:`compress`.
+
+        Args:
+            reset: Reset hit and miss counters.
+
+        Returns:
+            dict: ``hits``, ``misses``, ``hit_rate`` (``0.0`` - ``1.0``),
+            number of stored bodies (``entries``) and their total ``size``
+            in bytes.
+
+        .. versionadded:: 0.5.0
+        """
+        with self._compressed_lock:
+            hits = self._compressed_hits
+            misses = self._compressed_misses
+            stats = dict(hits=hits, misses=misses,
+                         hit_rate=hits / (hits + misses) if hits else 0.0,
+                         entries=len(self._compressed),
+                         size=self._compressed_size)
+            if reset:
+                self._compressed_hits = self._compressed_misses = 0
+        return stats
+
+    # Prepares data and 'default' function for the serialization:
+    # rounds floats if float precision is set (values returned by the
+    # default() are rounded too) and adds memo of default() results
+    # if JSON_ENCODE_MEMO is enabled.
+    # Returns data and kwargs with replaced 'default'.
+    def _wrap_default(self, obj, float_precision, kwargs):
+        config = self._app.config
+        if float_precision is None:
+            float_precision = config.get('JSON_FLOAT_PRECISION')
+        memo = config.get('JSON_ENCODE_MEMO')
+        if not float_precision and not memo:
+            return obj, kwargs
+        default = kwargs.get('default', self.default)
+        if float_precision:
+            obj = _round_floats(obj, float_precision)
+            default = partial(_round_default, default, float_precision)
+        if memo:
+            default = _memoize(default)
+        kwargs['default'] = default
+        return obj, kwargs
+
+    # Returns copy of the data where all dict keys are converted to strings
+    # in the same way as JSON encoder does, so they can be sorted.
+    # Dicts are rebuilt in sorted order which is cached per key set.
+    def _normalize_keys(self, obj):
+        if isinstance(obj, dict):
+            shape = frozenset(obj)
+            order = self._key_orders.get(shape)
+            if order is None:
+                if len(self._key_orders) >= self.key_orders_limit:
+                    self._key_orders.clear()
+                # Different keys may have the same name (1 and '1'),
+                # so only names are compared.
+                order = sorted(((_json_key(k), k) for k in obj),
+                               key=itemgetter(0))
+                order = self._key_orders[shape] = tuple(order)
+            return {name: self._normalize_keys(obj[k]) for name, k in order}
+        elif isinstance(obj, (list, tuple)):
+            return [self._normalize_keys(x) for x in obj]
+        return obj
+
+    # Returns json.dumps() formatting arguments used for the responses.
+    # Same rules as in DefaultJSONProvider.response().
+    def _dump_args(self):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return {'indent': 2}
+        return {'separators': (',', ':')}
+
+    def encode(self, obj, newline=False, float_precision=None):
+        """Serialize data to JSON bytes formatted in the same way as
+        JSON response body.
+
+        Args:
+            obj: Data to serialize.
+            newline: Add trailing newline (as Flask does for responses).
+            float_precision: Number of significant digits for floats,
+                see :meth:`dumps`.
+
+        Returns:
+            bytes: UTF-8 encoded JSON.
+
+        .. versionadded:: 0.5.0
+        """
+        text = self.dumps(obj, float_precision=float_precision,
+                          **self._dump_args())
+        if newline:
+            text += '\n'
+        return text.encode('utf-8')
+
+    def dumps_binary(self, obj, mimetype, float_precision=None):
+        """Serialize data to binary format (MessagePack or CBOR).
+
+        The same encoders are used as for JSON.
+
+        Args:
+            obj: Data to serialize.
+            mimetype: Format mimetype, see
+                :ref:`JSON_BINARY_FORMATS <opt_binary_formats>`.
+            float_precision: Number of significant digits for floats,
+                see :meth:`dumps`.
+
+        Returns:
+            bytes: Serialized data.
+
+        .. versionadded:: 0.5.0
+        """
+        obj, kwargs = self._wrap_default(obj, float_precision, {})
+        return _binary_formats[mimetype][0](
+            obj, kwargs.get('default', self.default))
+
+    def loads_binary(self, data, mimetype):
+        """Deserialize data from binary format (MessagePack or CBOR).
+
+        Args:
+            data: Serialized data.
+            mimetype: Format mimetype, see
+                :ref:`JSON_BINARY_FORMATS <opt_binary_formats>`.
+
+        .. versionadded:: 0.5.0
+        """
+        return _binary_formats[mimetype][1](data)
+
     def _prepare_response_obj(self, args, kwargs):
         obj = super(FlaskJSONProvider, self)._prepare_response_obj(args, kwargs)
         return obj if obj is not None else {}
@@ -38,6 +38,24 @@ class FlaskClient(_FlaskClient):
         return self.post(url, headers=headers, data=content)
 
 
+def records_from_columnar(data):
+    """Helper function to convert columnar JSON back to list of records.
+
+    Usage:
+
+        records_from_columnar({'columns': ['a', 'b'], 'rows': [[1, 2]]})
+        # [{'a': 1, 'b': 2}]
+
+    Args:
+        data: Columnar data: ``{"columns": [...], "rows": [[...], ...]}``.
+
+    Returns:
+        list: List of dictionaries.
+    """
+    columns = data['columns']
+    return [dict(zip(columns, row)) for row in data['rows']]
+
+
 @pytest.fixture
 def app():
     """This pytest fixture setups flask application
@@ -292,3 +292,114 @@ class TestAsJson(object):
 
         assert r.headers.get('Content-Type') == 'application/json'
         assert r.headers.get('MY') == 'hdr'
+
+    # Test: @as_json with parameters and without declared return type.
+    def test_add_status_param(self):
+        @as_json(add_status=False)
+        def view1():
+            return dict(value=1), 400
+
+        r = view1()
+        assert r.status_code == 400
+        assert r.json == {'value': 1}
+
+    # Test: view keys may have the same names as json_response() arguments.
+    def test_option_keys(self):
+        @as_json
+        def view1():
+            return {'lazy_': 1, 'float_precision_': 2, 'status_': 3}, 201
+
+        @as_json
+        def view2():
+            return {'columnar_': 1, 'status': 'ok'}
+
+        r = view1()
+        assert r.status_code == 201
+        assert r.json == {'lazy_': 1, 'float_precision_': 2, 'status_': 3,
+                          'status': 201}
+        assert view2().json == {'columnar_': 1, 'status': 'ok'}
+
+    # Test: declared dict return value.
+    def test_returns_dict(self, app):
+        @as_json(returns=dict)
+        def view1():
+            """Doc"""
+            return dict(value=1)
+
+        assert view1.__doc__ == 'Doc'
+        assert view1.__name__ == 'view1'
+
+        r = view1()
+        assert r.status_code == 200
+        assert r.headers.get('Content-Type') == 'application/json'
+        assert r.json == {'status': 200, 'value': 1}
+
+        # Existing status field is not replaced.
+        @as_json(returns=dict)
+        def view2():
+            return dict(value=1, status='ok')
+
+        assert view2().json == {'status': 'ok', 'value': 1}
+
+    # Test: declared dict return value, status field is disabled.
+    def test_returns_dict_no_status(self, app):
+        @as_json(returns=dict, add_status=False)
+        def view1():
+            return dict(value=1)
+
+        assert view1().json == {'value': 1}
+
+        app.config['JSON_ADD_STATUS'] = False
+
+        @as_json(returns=dict)
+        def view2():
+            return dict(value=1)
+
+        assert view2().json == {'value': 1}
+
+    # Test: configuration is cached per application on the first call.
+    def test_returns_dict_config_cache(self, app):
+        @as_json(returns=dict)
+        def view1():
+            return dict(value=1)
+
+        app.config['JSON_STATUS_FIELD_NAME'] = 'code'
+        assert view1().json == {'code': 200, 'value': 1}
+
+        app.config['JSON_STATUS_FIELD_NAME'] = 'other'
+        assert view1().json == {'code': 200, 'value': 1}
+
+    # Test: declared non-dict return value.
+    def test_returns_list(self):
+        @as_json(returns=list)
+        def view1():
+            return [1, '2']
+
+        r = view1()
+        assert r.status_code == 200
+        assert r.json == [1, '2']
+
+    # Test: static view is called once, encoded response is reused.
+    def test_static(self, app):
+        calls = []
+
+        @as_json(static=True)
+        def view1():
+            calls.append(1)
+            return dict(value=1), 201, {'MY': 'hdr'}
+
+        for _ in range(3):
+            r = view1()
+            assert r.status_code == 201
+            assert r.json == {'status': 201, 'value': 1}
+            assert r.headers.get('MY') == 'hdr'
+        assert len(calls) == 1
+
+        # Responses are independent objects.
+        r.headers['MY'] = 'changed'
+        assert view1().headers.get('MY') == 'hdr'
+
+        # Settings change invalidates cached response.
+        app.config['JSON_ADD_STATUS'] = False
+        assert view1().json == {'value': 1}
+        assert len(calls) == 2
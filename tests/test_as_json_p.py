@@ -4,7 +4,7 @@ This module provides tests for @as_json_p() decorator.
 import sys
 import pytest
 from werkzeug.exceptions import BadRequest
-from flask import Response, json
+from flask import Response, json, request
 from flask_json import json_response, _json_p_handler, as_json_p
 
 
@@ -250,3 +250,33 @@ class TestAsJsonP(object):
                 param = param[:-1]
             text = 'foo(%s);' % param
             assert r.get_data(as_text=True) == text
+
+    # Test: dotted callback names are allowed.
+    def test_callback_dotted(self, app):
+        with req(app, '/?callback=jQuery.cb_1$'):
+            r = _json_p_handler([1, 2])
+            assert r.get_data(as_text=True) == 'jQuery.cb_1$([1,2]);'
+
+    # Test: callback name must be a valid JavaScript identifier.
+    @pytest.mark.parametrize('name', [
+        'alert(1)//', 'a b', '1abc', 'foo.', '<script>', 'a;b', 'café',
+        'ж', 'a\u0661'])
+    def test_callback_invalid(self, app, name):
+        with req(app, '/', query_string={'callback': name}):
+            with pytest.raises(BadRequest):
+                _json_p_handler({'x': 1})
+
+    # Test: JSONP body is assembled from chunks without re-encoding payload,
+    # content length is still correct.
+    def test_chunks(self, app):
+        @as_json_p
+        def view():
+            return dict(val=1), 400, {'X-HDR': 1}
+
+        with req(app, '/?callback=foo'):
+            r = view()
+            assert r.response == [b'foo(', b'{"val":1}', b');']
+            assert r.status_code == 200
+            assert 'X-HDR' not in r.headers
+            headers = r.get_wsgi_headers(request.environ)
+            assert headers['Content-Length'] == '15'
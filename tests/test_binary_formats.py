@@ -0,0 +1,111 @@
+"""
+This module provides tests for MessagePack and CBOR support.
+"""
+from datetime import date, datetime
+import pytest
+from flask import Flask, request
+from flask_json import FlaskJSON, as_json, json_response, json_constant
+
+msgpack = pytest.importorskip('msgpack')
+cbor2 = pytest.importorskip('cbor2')
+
+
+@pytest.fixture
+def theapp(app):
+    app.config['JSON_BINARY_FORMATS'] = ['application/msgpack',
+                                         'application/cbor']
+
+    @app.route('/view')
+    @as_json
+    def view():
+        return dict(value=1, items=(x for x in [1, 2]))
+
+    @app.route('/date')
+    def date_view():
+        return json_response(dt=date(2015, 12, 7))
+
+    @app.route('/datetime')
+    def datetime_view():
+        return json_response(items=[{'dt': datetime(2015, 12, 7, 10, 30)}])
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return json_response(data_=request.get_json())
+
+    app.add_url_rule('/const', 'const', json_constant({'ok': True}))
+    yield app
+
+
+@pytest.mark.usefixtures('theapp')
+class TestBinaryFormats(object):
+    # Test: JSON is used by default.
+    def test_json(self, client):
+        r = client.get('/view')
+        assert r.mimetype == 'application/json'
+        assert r.json == {'value': 1, 'items': [1, 2], 'status': 200}
+        assert r.headers['Vary'] == 'Accept'
+
+        r = client.get('/view', headers={'Accept': 'text/html, */*'})
+        assert r.mimetype == 'application/json'
+
+    # Test: MessagePack response.
+    def test_msgpack(self, client):
+        r = client.get('/view', headers={'Accept': 'application/msgpack'})
+        assert r.mimetype == 'application/msgpack'
+        assert msgpack.unpackb(r.data) == \
+            {'value': 1, 'items': [1, 2], 'status': 200}
+
+    # Test: CBOR response.
+    def test_cbor(self, client):
+        r = client.get('/view', headers={
+            'Accept': 'application/json;q=0.5, application/cbor'})
+        assert r.mimetype == 'application/cbor'
+        assert cbor2.loads(r.data) == \
+            {'value': 1, 'items': [1, 2], 'status': 200}
+
+    # Test: encoding rules are the same as for JSON.
+    def test_encoders(self, app, client):
+        app.config['JSON_DATE_FORMAT'] = '%Y.%m.%d'
+        r = client.get('/date', headers={'Accept': 'application/msgpack'})
+        assert msgpack.unpackb(r.data)['dt'] == '2015.12.07'
+
+    # Test: CBOR datetime values are encoded as in JSON.
+    def test_cbor_datetime(self, app, client):
+        app.config['JSON_DATETIME_FORMAT'] = 'iso'
+        r = client.get('/datetime', headers={'Accept': 'application/cbor'})
+        assert r.status_code == 200
+        assert cbor2.loads(r.data)['items'] == [{'dt': '2015-12-07T10:30:00'}]
+
+        r = client.get('/date', headers={'Accept': 'application/cbor'})
+        assert cbor2.loads(r.data)['dt'] == client.get('/date').json['dt']
+
+    # Test: constant responses are negotiated too.
+    def test_constant(self, client):
+        r = client.get('/const', headers={'Accept': 'application/msgpack'})
+        assert msgpack.unpackb(r.data) == {'ok': True, 'status': 200}
+        r = client.get('/const')
+        assert r.json == {'ok': True, 'status': 200}
+
+    # Test: binary requests.
+    @pytest.mark.parametrize('mimetype,dumps', [
+        ('application/msgpack', msgpack.packb),
+        ('application/cbor', cbor2.dumps)])
+    def test_request(self, client, mimetype, dumps):
+        r = client.post('/echo', data=dumps({'x': [1, 'a']}),
+                        content_type=mimetype)
+        assert r.json == {'x': [1, 'a'], 'status': 200}
+
+    # Test: invalid binary request.
+    def test_request_invalid(self, client):
+        r = client.post('/echo', data=b'\xc1',
+                        content_type='application/msgpack')
+        assert r.status_code == 400
+        assert r.json == {'status': 400, 'description': 'Not a JSON.'}
+
+
+# Test: unsupported format in config.
+def test_unsupported_format():
+    app = Flask('testapp')
+    app.config['JSON_BINARY_FORMATS'] = ['application/bson']
+    with pytest.raises(ValueError):
+        FlaskJSON(app)
@@ -0,0 +1,158 @@
+"""
+This module provides tests for @as_json(coalesce=...).
+"""
+import threading
+import pytest
+from flask import request
+from flask_json import as_json, JsonError
+
+
+# Helper function to run concurrent requests.
+def run(client, url, count, headers=()):
+    results = [None] * count
+
+    def request(i):
+        results[i] = client.get(url, headers=headers[i] if headers else None)
+
+    threads = [threading.Thread(target=request, args=(i,))
+               for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+@pytest.fixture
+def theapp(app):
+    app.state = {'calls': 0, 'release': threading.Event(), 'fail': False}
+
+    def compute():
+        app.state['calls'] += 1
+        app.state['release'].wait(5)
+        if app.state['fail']:
+            raise JsonError(status_=503, description='fail')
+        return dict(calls=app.state['calls'])
+
+    @app.route('/view')
+    @as_json(coalesce=True)
+    def view():
+        return compute()
+
+    @app.route('/post', methods=['POST'])
+    @as_json(coalesce=True)
+    def post():
+        app.state['calls'] += 1
+        app.state['release'].wait(5)
+        return dict(got=request.get_json())
+
+    @app.route('/lang')
+    @as_json(coalesce=['Accept-Language'])
+    def lang():
+        return compute()
+
+    yield app
+
+
+# Releases views after all requests are started.
+def release_later(app, delay=0.3):
+    timer = threading.Timer(delay, app.state['release'].set)
+    timer.start()
+    return timer
+
+
+@pytest.mark.usefixtures('theapp')
+class TestCoalesce(object):
+    # Test: concurrent requests share single view call.
+    def test_shared(self, app, client):
+        release_later(app)
+        results = run(client, '/view', 5)
+        assert app.state['calls'] == 1
+        for r in results:
+            assert r.status_code == 200
+            assert r.json == {'calls': 1, 'status': 200}
+
+        # Next requests call the view again.
+        assert client.get('/view').json == {'calls': 2, 'status': 200}
+
+    # Test: error is propagated to waiting requests.
+    def test_error(self, app, client):
+        app.state['fail'] = True
+        release_later(app)
+        results = run(client, '/view', 3)
+        assert app.state['calls'] == 1
+        for r in results:
+            assert r.status_code == 503
+            assert r.json == {'description': 'fail', 'status': 503}
+
+    # Test: waiting requests call the view on timeout.
+    def test_timeout(self, app, client):
+        app.config['JSON_COALESCE_TIMEOUT'] = 0.05
+        release_later(app)
+        run(client, '/view', 3)
+        assert app.state['calls'] == 3
+
+    # Test: selected headers are part of the key.
+    def test_headers(self, app, client):
+        release_later(app)
+        headers = [{'Accept-Language': x} for x in ('en', 'de', 'en', 'de')]
+        results = run(client, '/lang', 4, headers)
+        assert app.state['calls'] == 2
+        assert all(r.status_code == 200 for r in results)
+
+    # Test: conditional and Range headers are processed for each request.
+    def test_conditional(self, app, client):
+        app.config['JSON_ACCEPT_RANGES'] = True
+        release_later(app)
+        headers = [{'If-None-Match': '*'}, {}, {'Range': 'bytes=0-4'}] * 2
+        results = run(client, '/view', 6, headers)
+        assert app.state['calls'] == 1
+        for h, r in zip(headers, results):
+            if 'Range' in h:
+                assert r.status_code == 206
+                assert r.data == b'{"cal'
+            elif h:
+                assert r.status_code == 304
+            else:
+                assert r.status_code == 200
+                assert r.json == {'calls': 1, 'status': 200}
+            r.close()
+
+    # Test: requests to different hosts are not coalesced.
+    def test_host(self, app, client):
+        release_later(app)
+        headers = [{'Host': x} for x in ('a.test', 'b.test', 'a.test')]
+        results = run(client, '/view', 3, headers)
+        assert app.state['calls'] == 2
+        assert all(r.status_code == 200 for r in results)
+
+    # Test: non-GET requests are not coalesced.
+    def test_post(self, app, client):
+        release_later(app)
+        results = [None] * 3
+
+        def post(i):
+            results[i] = client.post_json('/post', {'i': i})
+
+        threads = [threading.Thread(target=post, args=(i,))
+                   for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert app.state['calls'] == 3
+        for i, r in enumerate(results):
+            assert r.json == {'got': {'i': i}, 'status': 200}
+
+
+# Test: async views support.
+def test_async_view(app, client):
+    pytest.importorskip('asgiref')
+
+    @app.route('/async')
+    @as_json(coalesce=True)
+    async def view():
+        return dict(value=1)
+
+    r = client.get('/async')
+    assert r.json == {'value': 1, 'status': 200}
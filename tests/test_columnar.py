@@ -0,0 +1,88 @@
+"""
+This module provides tests for columnar output mode.
+"""
+import pytest
+from flask_json import as_json, json_response
+from conftest import records_from_columnar
+
+RECORDS = [{'id': x, 'name': 'item%d' % x, 'tags': [x]} for x in range(5)]
+
+
+@pytest.fixture
+def theapp(app):
+    @app.route('/list')
+    @as_json(columnar=True)
+    def records():
+        return RECORDS
+
+    @app.route('/dict')
+    @as_json(returns=dict, columnar=True)
+    def records_dict():
+        return dict(items=RECORDS, ids=[1, 2], total=5)
+
+    @app.route('/tuple')
+    @as_json(columnar=True)
+    def records_tuple():
+        return dict(items=RECORDS), 201
+
+    yield app
+
+
+class TestColumnar(object):
+    # Test: list of records is converted, status is not added.
+    def test_list(self, app_request):
+        r = json_response(data_=RECORDS, columnar_=True)
+        assert r.json == {
+            'columns': ['id', 'name', 'tags'],
+            'rows': [[x, 'item%d' % x, [x]] for x in range(5)]
+        }
+        assert records_from_columnar(r.json) == RECORDS
+
+    # Test: top-level list fields of the dict are converted.
+    def test_fields(self, app_request):
+        r = json_response(columnar_=True, items=RECORDS, ids=[1, 2],
+                          empty=[], one=[{'x': 1}])
+        assert r.json['status'] == 200
+        assert records_from_columnar(r.json['items']) == RECORDS
+        assert r.json['ids'] == [1, 2]
+        assert r.json['empty'] == []
+        assert r.json['one'] == {'columns': ['x'], 'rows': [[1]]}
+
+    # Test: non-homogeneous lists are sent as is.
+    def test_mixed(self, app_request):
+        data = [{'a': 1}, {'b': 2}]
+        assert json_response(data_=data, columnar_=True).json == data
+
+        data = [{'a': 1}, {'a': 2, 'b': 3}]
+        assert json_response(data_=data, columnar_=True).json == data
+
+        data = [{'a': 1}, 2]
+        assert json_response(data_=data, columnar_=True).json == data
+
+        data = [{}, {}]
+        assert json_response(data_=data, columnar_=True).json == data
+
+    # Test: keys order of the first record is used for columns.
+    def test_order(self, app_request):
+        data = [{'a': 1, 'b': 2}, {'b': 4, 'a': 3}]
+        r = json_response(data_=data, columnar_=True)
+        assert r.json == {'columns': ['a', 'b'], 'rows': [[1, 2], [3, 4]]}
+
+    # Test: columnar mode is disabled by default.
+    def test_default(self, app_request):
+        assert json_response(data_=RECORDS).json == RECORDS
+
+    # Test: @as_json(columnar=True).
+    def test_as_json(self, theapp, client):
+        r = client.get('/list')
+        assert records_from_columnar(r.json) == RECORDS
+
+        r = client.get('/dict')
+        assert r.json['status'] == 200
+        assert r.json['total'] == 5
+        assert r.json['ids'] == [1, 2]
+        assert records_from_columnar(r.json['items']) == RECORDS
+
+        r = client.get('/tuple')
+        assert r.status_code == 201
+        assert records_from_columnar(r.json['items']) == RECORDS
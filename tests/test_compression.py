@@ -0,0 +1,276 @@
+"""
+This module provides tests for JSON responses compression
+(JSON_COMPRESSION).
+"""
+import gzip
+import json
+import pytest
+from flask import Flask
+from flask_json import FlaskJSON, as_json, json_constant, SharedMemoryCache
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+ITEMS = [{'id': i, 'name': 'item %d' % i} for i in range(100)]
+
+
+@pytest.fixture
+def theapp(app):
+    app.config['JSON_COMPRESSION'] = ['gzip']
+    app.state = {'calls': 0}
+
+    @app.route('/items')
+    @as_json
+    def items():
+        app.state['calls'] += 1
+        return dict(items=ITEMS)
+
+    @app.route('/small')
+    @as_json
+    def small():
+        return dict(value=1)
+
+    app.add_url_rule('/constant', 'constant', json_constant(dict(items=ITEMS)))
+    return app
+
+
+def decode(r):
+    assert r.headers['Content-Encoding'] == 'gzip'
+    assert int(r.headers['Content-Length']) == len(r.data)
+    return json.loads(gzip.decompress(r.data))
+
+
+class TestCompression(object):
+    # Test: body is compressed if client accepts it.
+    def test_gzip(self, theapp):
+        client = theapp.test_client()
+        r = client.get('/items', headers={'Accept-Encoding': 'gzip'})
+        assert r.status_code == 200
+        assert decode(r) == {'items': ITEMS, 'status': 200}
+        assert r.headers['Vary'] == 'Accept-Encoding'
+
+        r = client.get('/items')
+        assert 'Content-Encoding' not in r.headers
+        assert r.json == {'items': ITEMS, 'status': 200}
+        assert r.headers['Vary'] == 'Accept-Encoding'
+
+        r = client.get('/items', headers={'Accept-Encoding': 'gzip;q=0, br'})
+        assert 'Content-Encoding' not in r.headers
+
+    # Test: small bodies are not compressed.
+    def test_min_size(self, theapp):
+        client = theapp.test_client()
+        r = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in r.headers
+        assert r.json == {'value': 1, 'status': 200}
+
+        theapp.config['JSON_COMPRESSION_MIN_SIZE'] = 0
+        r = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        assert decode(r) == {'value': 1, 'status': 200}
+
+    # Test: compression is disabled by default.
+    def test_disabled(self, app):
+        @app.route('/items')
+        @as_json
+        def items():
+            return dict(items=ITEMS)
+
+        r = app.test_client().get('/items',
+                                  headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in r.headers
+        assert 'Vary' not in r.headers
+
+    # Test: unsupported compression raises error.
+    def test_unsupported(self):
+        app = Flask(__name__)
+        app.config['JSON_COMPRESSION'] = ['compress']
+        with pytest.raises(ValueError):
+            FlaskJSON(app)
+
+    # Test: best encoding is selected by the client and server preferences.
+    @pytest.mark.skipif(zstandard is None, reason='zstandard is required')
+    def test_negotiate(self, theapp):
+        theapp.config['JSON_COMPRESSION'] = ['zstd', 'gzip']
+        client = theapp.test_client()
+        r = client.get('/items', headers={'Accept-Encoding': 'gzip, zstd'})
+        assert r.headers['Content-Encoding'] == 'zstd'
+        data = zstandard.ZstdDecompressor().decompressobj().decompress(r.data)
+        assert json.loads(data) == {'items': ITEMS, 'status': 200}
+
+        r = client.get('/items',
+                       headers={'Accept-Encoding': 'gzip, zstd;q=0.5'})
+        assert decode(r) == {'items': ITEMS, 'status': 200}
+
+    # Test: brotli compression.
+    @pytest.mark.skipif(brotli is None, reason='brotli is required')
+    def test_brotli(self, theapp):
+        theapp.config['JSON_COMPRESSION'] = ['br', 'gzip']
+        r = theapp.test_client().get('/items',
+                                     headers={'Accept-Encoding': 'gzip, br'})
+        assert r.headers['Content-Encoding'] == 'br'
+        data = json.loads(brotli.decompress(r.data))
+        assert data == {'items': ITEMS, 'status': 200}
+
+    # Test: compressed bodies are reused.
+    def test_memo(self, theapp):
+        client = theapp.test_client()
+        provider = theapp.json
+        for _ in range(3):
+            r = client.get('/items', headers={'Accept-Encoding': 'gzip'})
+            assert decode(r) == {'items': ITEMS, 'status': 200}
+
+        stats = provider.compression_stats(reset=True)
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == pytest.approx(2 / 3)
+        assert stats['entries'] == 1
+        assert stats['size'] == len(r.data)
+
+        stats = provider.compression_stats()
+        assert stats['hits'] == stats['misses'] == 0
+        assert stats['hit_rate'] == 0.0
+        assert stats['entries'] == 1
+
+    # Test: least recently used bodies are evicted.
+    def test_memo_limit(self, theapp):
+        provider = theapp.json
+        bodies = [json.dumps(ITEMS[:i]).encode() for i in (10, 20, 30)]
+        values = [provider.compress(body, 'gzip') for body in bodies]
+        sizes = [len(v) for v in values]
+
+        theapp.config['JSON_COMPRESSION_MEMO_SIZE'] = sizes[1] + sizes[2]
+        provider.compress(bodies[1], 'gzip')
+        provider.compress(bodies[2], 'gzip')
+        stats = provider.compression_stats()
+        assert stats['entries'] == 3
+        assert stats['hits'] == 2
+
+        provider.compress(bodies[0] + b' ', 'gzip')
+        stats = provider.compression_stats()
+        assert stats['entries'] == 2
+        assert stats['size'] <= sizes[1] + sizes[2]
+        provider.compress(bodies[2], 'gzip')
+        assert provider.compression_stats()['hits'] == 3
+        provider.compress(bodies[1], 'gzip')
+        assert provider.compression_stats()['misses'] == 5
+
+        # Memo is disabled.
+        theapp.config['JSON_COMPRESSION_MEMO_SIZE'] = 0
+        assert provider.compress(bodies[2], 'gzip') == values[2]
+        assert provider.compression_stats()['hits'] == 3
+
+    # Test: stored responses keep uncompressed body.
+    def test_stored(self, theapp):
+        client = theapp.test_client()
+        for headers in ({'Accept-Encoding': 'gzip'}, {}, {}):
+            r = client.get('/constant', headers=headers)
+            if headers:
+                assert decode(r) == {'items': ITEMS, 'status': 200}
+            else:
+                assert 'Content-Encoding' not in r.headers
+                assert r.json == {'items': ITEMS, 'status': 200}
+
+    # Test: cached responses are compressed per request.
+    def test_cache(self, theapp):
+        cache = SharedMemoryCache(slots=4, slot_size=64 * 1024, ways=2)
+        try:
+            @theapp.route('/cached')
+            @as_json(cache=cache)
+            def cached():
+                theapp.state['calls'] += 1
+                return dict(items=ITEMS)
+
+            client = theapp.test_client()
+            r = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+            assert decode(r) == {'items': ITEMS, 'status': 200}
+            r = client.get('/cached')
+            assert 'Content-Encoding' not in r.headers
+            assert r.json == {'items': ITEMS, 'status': 200}
+            r = client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+            assert decode(r) == {'items': ITEMS, 'status': 200}
+            assert theapp.state['calls'] == 1
+        finally:
+            cache.close()
+
+    # Test: ranges apply to the compressed body; ETag depends on the content
+    # coding.
+    def test_ranges(self, theapp):
+        theapp.config['JSON_ACCEPT_RANGES'] = True
+        client = theapp.test_client()
+        gzipped = {'Accept-Encoding': 'gzip'}
+        r = client.get('/items', headers=gzipped)
+        assert r.headers['Accept-Ranges'] == 'bytes'
+        assert decode(r) == {'items': ITEMS, 'status': 200}
+        body, tag = r.data, r.headers['ETag']
+        plain_tag = client.get('/items').headers['ETag']
+        assert tag != plain_tag
+
+        r = client.get('/items', headers=dict(gzipped, Range='bytes=0-9'))
+        assert r.status_code == 206
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert r.data == body[:10]
+
+        r = client.get('/items', headers=dict(gzipped, **{
+            'If-None-Match': tag}))
+        assert r.status_code == 304
+        r = client.get('/items', headers={'If-None-Match': tag})
+        assert r.status_code == 200
+        assert r.json == {'items': ITEMS, 'status': 200}
+
+    # Test: stored responses get ETag of the selected representation.
+    def test_stored_etag(self, theapp):
+        theapp.config['JSON_ACCEPT_RANGES'] = True
+        cache = SharedMemoryCache(slots=4, slot_size=64 * 1024, ways=2)
+        try:
+            @theapp.route('/cached')
+            @as_json(cache=cache)
+            def cached():
+                return dict(items=ITEMS)
+
+            client = theapp.test_client()
+            gzipped = {'Accept-Encoding': 'gzip'}
+            for url in ('/cached', '/constant'):
+                tags = set()
+                for headers in (gzipped, {}, gzipped, {}):
+                    r = client.get(url, headers=headers)
+                    assert r.status_code == 200
+                    if headers:
+                        assert decode(r) == {'items': ITEMS, 'status': 200}
+                    tags.add((bool(headers), r.headers['ETag']))
+                assert len(tags) == 2
+
+                tag = client.get(url, headers=gzipped).headers['ETag']
+                r = client.get(url, headers={'If-None-Match': tag})
+                assert r.status_code == 200
+                r = client.get(url, headers=dict(gzipped, **{
+                    'If-None-Match': tag}))
+                assert r.status_code == 304
+        finally:
+            cache.close()
+
+    # Test: version tags of compressed responses.
+    def test_version_etag(self, theapp):
+        @theapp.route('/versioned')
+        @as_json(etag=lambda: 1)
+        def versioned():
+            theapp.state['calls'] += 1
+            return dict(items=ITEMS)
+
+        client = theapp.test_client()
+        gzipped = {'Accept-Encoding': 'gzip'}
+        tag = client.get('/versioned', headers=gzipped).headers['ETag']
+        plain_tag = client.get('/versioned').headers['ETag']
+        assert tag != plain_tag
+
+        r = client.get('/versioned', headers=dict(gzipped, **{
+            'If-None-Match': tag}))
+        assert r.status_code == 304
+        assert r.headers['ETag'] == tag
+        assert 'Accept-Encoding' in r.headers['Vary']
+        assert theapp.state['calls'] == 2
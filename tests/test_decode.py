@@ -2,9 +2,15 @@
 """
 This module provides tests for Flask-JSON decoder feature.
 """
+import gzip
+import io
+import json
+import zlib
+from time import perf_counter
+from datetime import datetime, date, time, timedelta, timezone
 import pytest
 from flask import request
-from flask_json import json_response
+from flask_json import json_response, LazyJSON
 
 
 @pytest.fixture
@@ -64,3 +70,298 @@ class TestDecode(object):
         app.config['JSON_DECODE_ERROR_MESSAGE'] = None
         r = client.post_json('/test', data='bla', raw=True)
         assert r.json == dict(status=400)
+
+
+@pytest.mark.usefixtures('theapp')
+class TestRequestLimits(object):
+    # Test: request size limit is checked by Content-Length.
+    def test_max_bytes(self, app, client):
+        app.config['JSON_MAX_REQUEST_BYTES'] = 20
+        r = client.post_json('/test', dict(x='a' * 10))
+        assert r.status_code == 200
+
+        r = client.post_json('/test', dict(x='a' * 20))
+        assert r.status_code == 413
+        assert r.json == dict(status=413, description='Request is too large.')
+
+    # Test: request size limit is checked while reading the stream
+    # (no Content-Length).
+    def test_max_bytes_stream(self, app, client):
+        app.config['JSON_MAX_REQUEST_BYTES'] = 20
+        headers = [('Content-Type', 'application/json'),
+                   ('Transfer-Encoding', 'chunked')]
+        env = {'wsgi.input_terminated': True}
+
+        r = client.post('/test', headers=headers, environ_overrides=env,
+                        input_stream=io.BytesIO(b'{"x": 1}'))
+        assert r.json == dict(status=200, x=1)
+
+        r = client.post('/test', headers=headers, environ_overrides=env,
+                        input_stream=io.BytesIO(b'{"x": "%s"}' % (b'a' * 20)))
+        assert r.status_code == 413
+
+    # Test: depth limit; brackets in strings are ignored.
+    def test_max_depth(self, app, client):
+        app.config['JSON_MAX_DEPTH'] = 3
+        r = client.post_json('/test', dict(x=[[1], [2]], y='[[[[\\"{{'))
+        assert r.status_code == 200
+        assert r.json['y'] == '[[[[\\"{{'
+
+        r = client.post_json('/test', dict(x=[[[1]]]))
+        assert r.status_code == 400
+        assert r.json == dict(status=400,
+                              description='Request JSON is too deeply nested.')
+
+        r = client.post_json('/test', '[' * 100000, raw=True)
+        assert r.status_code == 400
+        assert r.json['description'] == 'Request JSON is too deeply nested.'
+
+    # Test: number of items limit.
+    def test_max_items(self, app, client):
+        app.config['JSON_MAX_ITEMS'] = 5
+        r = client.post_json('/test', dict(x=[1, 2], y='a,b,c,d,e'))
+        assert r.status_code == 200
+
+        r = client.post_json('/test', dict(x=list(range(10))))
+        assert r.status_code == 400
+        assert r.json['description'] == 'Too many items in the request JSON.'
+
+    # Test: unterminated strings with escaped quotes are scanned in linear
+    # time.
+    def test_unterminated_string(self, app, client):
+        app.config['JSON_MAX_DEPTH'] = 100
+        app.config['JSON_MAX_ITEMS'] = 100
+        for body in ('"' + '\\"' * 500000,
+                     '[{,' * 10 + '"' + '\\"[,' * 300000):
+            start = perf_counter()
+            r = client.post_json('/test', body, raw=True)
+            assert perf_counter() - start < 1
+            assert r.status_code == 400
+            assert r.json['description'] == 'Not a JSON.'
+
+        # Limit is checked before the string.
+        app.config['JSON_MAX_ITEMS'] = None
+        r = client.post_json('/test', '[' * 101 + '"' + '\\"' * 100000,
+                             raw=True)
+        assert r.json['description'] == 'Request JSON is too deeply nested.'
+
+
+@pytest.mark.usefixtures('theapp')
+class TestDecompress(object):
+    def post(self, client, data, encoding):
+        headers = [('Content-Type', 'application/json'),
+                   ('Content-Encoding', encoding)]
+        return client.post('/test', headers=headers, data=data)
+
+    # Test: compressed requests are not decompressed by default.
+    def test_disabled(self, client):
+        r = self.post(client, gzip.compress(b'{"x": 1}'), 'gzip')
+        assert r.status_code == 400
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+    # Test: gzip and deflate requests.
+    def test_gzip(self, app, client):
+        app.config['JSON_DECOMPRESS_REQUESTS'] = True
+        r = self.post(client, gzip.compress(b'{"x": 1}'), 'gzip')
+        assert r.json == dict(status=200, x=1)
+
+        r = self.post(client, zlib.compress(b'{"x": 2}'), 'deflate')
+        assert r.json == dict(status=200, x=2)
+
+        r = client.post_json('/test', dict(x=3))
+        assert r.json == dict(status=200, x=3)
+
+    # Test: zstd requests.
+    def test_zstd(self, app, client):
+        zstandard = pytest.importorskip('zstandard')
+        app.config['JSON_DECOMPRESS_REQUESTS'] = True
+        data = zstandard.ZstdCompressor().compress(b'{"x": 1}')
+        r = self.post(client, data, 'zstd')
+        assert r.json == dict(status=200, x=1)
+
+        r = self.post(client, b'bla', 'zstd')
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+    # Test: invalid compressed data is handled as invalid JSON.
+    def test_invalid(self, app, client):
+        app.config['JSON_DECOMPRESS_REQUESTS'] = True
+        r = self.post(client, b'bla', 'gzip')
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+        r = self.post(client, gzip.compress(b'{"x": 1}')[:-10], 'gzip')
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+        r = self.post(client, b'{"x": 1}', 'br')
+        assert r.status_code == 415
+
+    # Test: decompressed size is limited.
+    def test_max_bytes(self, app, client):
+        app.config['JSON_DECOMPRESS_REQUESTS'] = True
+        app.config['JSON_MAX_DECOMPRESSED_SIZE'] = 1000
+        data = b'{"x": "%s"}' % (b'a' * 10000)
+        r = self.post(client, gzip.compress(data), 'gzip')
+        assert r.status_code == 413
+        assert r.json == dict(status=413, description='Request is too large.')
+
+        app.config['JSON_MAX_DECOMPRESSED_SIZE'] = None
+        app.config['JSON_MAX_REQUEST_BYTES'] = 1000
+        r = self.post(client, gzip.compress(data), 'gzip')
+        assert r.status_code == 413
+
+
+@pytest.fixture
+def lazyapp(app):
+    @app.route('/lazy', methods=['POST'])
+    def lazy():
+        doc = request.get_json_lazy()
+        if isinstance(doc, LazyJSON):
+            return json_response(type=doc['type'], keys=list(doc),
+                                 raw=doc.raw.decode('utf-8'))
+        return json_response(data_=doc)
+
+    @app.route('/lazy/<key>', methods=['POST'])
+    def lazy_key(key):
+        doc = request.get_json_lazy()
+        return json_response(value=doc[key])
+    yield app
+
+
+@pytest.mark.usefixtures('lazyapp')
+class TestLazy(object):
+    # Test: lazy view of the request JSON object.
+    def test_lazy(self, client):
+        content = '{"type": "x", "data": {"items": [1, 2, "}"]}}'
+        r = client.post_json('/lazy', content, raw=True)
+        assert r.json == dict(status=200, type='x', keys=['type', 'data'],
+                              raw=content)
+
+    # Test: nested objects are lazy too.
+    def test_nested(self, app_request):
+        doc = LazyJSON(b'{"a": {"b": {"c": [1, 2]}, "d": null}, "e": "}"}')
+        nested = doc['a']
+        assert isinstance(nested, LazyJSON)
+        assert nested['b']['c'] == [1, 2]
+        assert nested['d'] is None
+        assert nested.raw == b'{"b": {"c": [1, 2]}, "d": null}'
+        assert doc == {'a': {'b': {'c': [1, 2]}, 'd': None}, 'e': '}'}
+        assert doc.load() == {'a': {'b': {'c': [1, 2]}, 'd': None}, 'e': '}'}
+        assert 'x' not in doc
+        assert len(doc) == 2
+
+    # Test: non-object JSON is parsed fully.
+    def test_not_object(self, client):
+        r = client.post_json('/lazy', [1, 2])
+        assert r.json == [1, 2]
+
+        r = client.post_json('/lazy', 'bla', raw=True)
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+    # Test: invalid values are detected on access.
+    def test_invalid(self, client):
+        content = '{"a": 1, "b": [1, 2 "c": 3}'
+        r = client.post_json('/lazy/a', content, raw=True)
+        assert r.json == dict(status=200, value=1)
+
+        r = client.post_json('/lazy/c', content, raw=True)
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+        content = '{"a": 1, "b": tru}'
+        r = client.post_json('/lazy/b', content, raw=True)
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+    # Test: duplicate keys are rejected.
+    def test_duplicate(self, client, app_request):
+        content = '{"a": 1, "b": 2, "a": 3}'
+        r = client.post_json('/lazy/b', content, raw=True)
+        assert r.json == dict(status=200, value=2)
+        r = client.post_json('/lazy', content, raw=True)
+        assert r.json == dict(status=400, description='Not a JSON.')
+
+        doc = LazyJSON(content)
+        with pytest.raises(ValueError):
+            len(doc)
+
+
+@pytest.fixture
+def dtapp(app):
+    app.config['JSON_DECODE_DATETIME'] = True
+
+    @app.route('/dt', methods=['POST'])
+    def dt():
+        data = request.get_json()
+        return json_response(
+            data_=dict((k, type(v).__name__) for k, v in data.items()))
+    yield app
+
+
+@pytest.mark.usefixtures('dtapp')
+class TestDecodeDatetime(object):
+    # Test: ISO 8601 strings are converted, other strings are not.
+    def test_decode(self, app, app_request):
+        data = app.json.loads(json.dumps(dict(
+            dt='2020-01-02T10:20:30', dt_ms='2020-01-02 10:20:30.123456',
+            dt_tz='2020-01-02T10:20:30+03:00', dt_z='2020-01-02T10:20:30Z',
+            d='2020-01-02', t='10:20:30', t_ms='10:20:30.5',
+            t_z='10:20:30Z', bad_d='2020-13-02', phone='12:34:56:78:90',
+            text='hello world', num='2020', nested=dict(d='2021-02-03'),
+            items=[dict(d='2022-03-04'), '2022-03-04'])))
+        assert data['dt'] == datetime(2020, 1, 2, 10, 20, 30)
+        assert data['dt_ms'] == datetime(2020, 1, 2, 10, 20, 30, 123456)
+        assert data['dt_tz'].utcoffset() == timedelta(hours=3)
+        assert data['dt_z'] == datetime(2020, 1, 2, 10, 20, 30,
+                                        tzinfo=timezone.utc)
+        assert data['d'] == date(2020, 1, 2)
+        assert data['t'] == time(10, 20, 30)
+        assert data['t_ms'] == time(10, 20, 30, 500000)
+        assert data['t_z'] == time(10, 20, 30, tzinfo=timezone.utc)
+        assert data['bad_d'] == '2020-13-02'
+        assert data['phone'] == '12:34:56:78:90'
+        assert data['text'] == 'hello world'
+        assert data['num'] == '2020'
+        assert data['nested'] == dict(d=date(2021, 2, 3))
+        assert data['items'] == [dict(d=date(2022, 3, 4)), date(2022, 3, 4)]
+
+    # Test: strings in lists and top level values are converted.
+    def test_lists(self, app, app_request):
+        data = app.json.loads(
+            '{"days": ["2020-01-02", ["2020-01-03", 1]], "x": ["a"]}')
+        assert data == dict(days=[date(2020, 1, 2), [date(2020, 1, 3), 1]],
+                            x=['a'])
+        assert app.json.loads('"2020-01-02"') == date(2020, 1, 2)
+        assert app.json.loads('"2020"') == '2020'
+        assert app.json.loads('["10:20:30", {"d": "2020-01-02"}]') == \
+            [time(10, 20, 30), dict(d=date(2020, 1, 2))]
+
+    # Test: only configured keys are converted.
+    def test_keys(self, app, app_request):
+        app.config['JSON_DECODE_DATETIME_KEYS'] = ['created']
+        data = app.json.loads('{"created": "2020-01-02", "d": "2020-01-02"}')
+        assert data == dict(created=date(2020, 1, 2), d='2020-01-02')
+
+        data = app.json.loads('{"created": ["2020-01-02"], "d": ["2020"]}')
+        assert data == dict(created=[date(2020, 1, 2)], d=['2020'])
+        assert app.json.loads('"2020-01-02"') == '2020-01-02'
+
+    # Test: lazy request JSON values are decoded in the same way.
+    @pytest.mark.parametrize('keys', [None, ['created', 'days']])
+    def test_lazy(self, app, keys):
+        app.config['JSON_DECODE_DATETIME_KEYS'] = keys
+        content = ('{"created": "2020-01-02", "days": ["2020-01-03"], '
+                   '"obj": {"created": "10:20:30"}}')
+        with app.test_request_context(
+                '/', method='POST', data=content,
+                content_type='application/json'):
+            doc = request.get_json_lazy()
+            assert doc['created'] == date(2020, 1, 2)
+            assert doc['days'] == [date(2020, 1, 3)]
+            assert doc['obj']['created'] == time(10, 20, 30)
+            assert doc.load() == request.get_json()
+
+    # Test: request JSON is decoded too.
+    def test_request(self, app, client):
+        r = client.post_json('/dt', dict(d='2020-01-02', x='2020'))
+        assert r.json == dict(status=200, d='date', x='str')
+
+        app.config['JSON_DECODE_DATETIME'] = False
+        r = client.post_json('/dt', dict(d='2020-01-02', x='2020'))
+        assert r.json == dict(status=200, d='str', x='str')
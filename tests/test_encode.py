@@ -22,6 +22,58 @@ class TestEncode(object):
         assert r.status_code, 200
         assert r.json == {'1': 2, '3': 4}
 
+    # Test: encode dict with numeric keys and status field.
+    # Keys of different types can't be sorted by default.
+    def test_dict_num_keys_status(self, app):
+        assert app.json.sort_keys
+        r = json_response(data_={2: 'b', 1: 'a', None: 0, 1.5: 'c'})
+        assert r.get_data() == \
+            b'{"1":"a","1.5":"c","2":"b","null":0,"status":200}\n'
+
+    # Test: nested dicts with mixed keys and values which may be encoded
+    # only once.
+    def test_dict_mixed_keys_nested(self, app):
+        r = json_response(data_={1: {'x': 1, 2: 2}, 'lst': [{3: 0, 'y': 1}],
+                                 'gen': (x for x in [1, 2])})
+        assert r.json == {'1': {'2': 2, 'x': 1}, 'lst': [{'3': 0, 'y': 1}],
+                          'gen': [1, 2], 'status': 200}
+
+    # Test: mixed keys are handled wherever the dict is nested, including
+    # values returned by the encoders.
+    def test_dict_mixed_keys_deep(self, app):
+        class Obj(object):
+            def __json__(self):
+                return {1: 'a', 'b': 2}
+
+        app.config['JSON_USE_ENCODE_METHODS'] = True
+        dumps = app.json.dumps
+        assert dumps({'a': {1: 'x', 'b': 2}}) == '{"a": {"1": "x", "b": 2}}'
+        assert dumps([{1: 'a', 'b': 2}]) == '[{"1": "a", "b": 2}]'
+        assert dumps([Obj()]) == '[{"1": "a", "b": 2}]'
+        assert dumps({1: 'x', '1': 'y'}) in ('{"1": "x"}', '{"1": "y"}')
+
+        # Generator is consumed before the mixed dict.
+        data = {'a': (x for x in [1, 2]), 'b': {1: 'x', 'y': 2}}
+        assert dumps(data) == '{"a": [1, 2], "b": {"1": "x", "y": 2}}'
+
+        # Not serializable values still raise the error.
+        with pytest.raises(TypeError):
+            dumps({'a': {1: 'x', 'b': object()}})
+
+    # Test: sorted key orders are cached per key set.
+    def test_dict_mixed_keys_cache(self, app):
+        rows = [{1: x, 'name': 'x'} for x in range(3)]
+        r = json_response(data_={0: rows})
+        assert r.json['0'] == [{'1': x, 'name': 'x'} for x in range(3)]
+        assert app.json._key_orders[frozenset([1, 'name'])] == \
+            (('1', 1), ('name', 'name'))
+
+    # Test: mixed keys without sorting.
+    def test_dict_mixed_keys_no_sort(self, app):
+        app.json.sort_keys = False
+        r = json_response(data_={2: 'b', 1: 'a'})
+        assert r.get_data() == b'{"2":"b","1":"a","status":200}\n'
+
     # Test: encode lazy string.
     def test_lazystring(self):
         speaklater = pytest.importorskip("speaklater")
@@ -201,3 +253,31 @@ class TestEncode(object):
     def test_encoder_invalid(self):
         with pytest.raises(TypeError):
             json_response(fake=object())
+
+    # Test: encoder results are reused for the same objects within one
+    # serialization if JSON_ENCODE_MEMO is enabled.
+    def test_memo(self, app):
+        class Owner(object):
+            calls = 0
+
+            def __json__(self):
+                Owner.calls += 1
+                return {'name': 'owner', 'ratio': 1 / 3.0}
+
+        app.config['JSON_USE_ENCODE_METHODS'] = True
+        owner = Owner()
+        rows = [{'id': x, 'owner': owner} for x in range(10)]
+
+        r = json_response(data_=rows)
+        assert Owner.calls == 10
+
+        Owner.calls = 0
+        app.config['JSON_ENCODE_MEMO'] = True
+        app.config['JSON_FLOAT_PRECISION'] = 2
+        r = json_response(data_=rows)
+        assert Owner.calls == 1
+        assert r.json[9]['owner'] == {'name': 'owner', 'ratio': 0.33}
+
+        # Memo is not shared between serializations.
+        json_response(data_=rows)
+        assert Owner.calls == 2
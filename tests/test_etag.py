@@ -0,0 +1,125 @@
+"""
+This module provides tests for @as_json(etag=...).
+"""
+import pytest
+from flask_json import as_json, JsonError
+
+
+@pytest.fixture
+def theapp(app):
+    app.state = {'calls': 0, 'version': 1, 'keys': []}
+
+    def version(**kwargs):
+        app.state['keys'].append(kwargs)
+        return app.state['version']
+
+    @app.route('/item/<int:id>', methods=['GET', 'POST'])
+    @as_json(etag=version)
+    def item(id):
+        app.state['calls'] += 1
+        if id == 0:
+            raise JsonError(status_=404)
+        return dict(id=id, version=app.state['version'])
+
+    @app.route('/none')
+    @as_json(etag=lambda **kw: None)
+    def noversion():
+        app.state['calls'] += 1
+        return dict(value=1)
+
+    return app
+
+
+class TestEtag(object):
+    # Test: response gets ETag; view arguments are passed to the function.
+    def test_etag(self, theapp):
+        r = theapp.test_client().get('/item/1')
+        assert r.status_code == 200
+        assert r.json == {'id': 1, 'version': 1, 'status': 200}
+        assert r.headers.get('ETag')
+        assert theapp.state['keys'] == [{'id': 1}]
+
+    # Test: matching If-None-Match returns 304 without calling the view.
+    def test_not_modified(self, theapp):
+        client = theapp.test_client()
+        tag = client.get('/item/1').headers['ETag']
+
+        r = client.get('/item/1', headers={'If-None-Match': tag})
+        assert r.status_code == 304
+        assert r.data == b''
+        assert r.headers['ETag'] == tag
+        assert theapp.state['calls'] == 1
+
+        # Weak comparison and wildcard.
+        r = client.get('/item/1', headers={'If-None-Match': 'W/' + tag})
+        assert r.status_code == 304
+        r = client.get('/item/1', headers={'If-None-Match': '*'})
+        assert r.status_code == 304
+        assert theapp.state['calls'] == 1
+
+    # Test: changed version or other arguments produce new response.
+    def test_modified(self, theapp):
+        client = theapp.test_client()
+        tag = client.get('/item/1').headers['ETag']
+
+        theapp.state['version'] = 2
+        r = client.get('/item/1', headers={'If-None-Match': tag})
+        assert r.status_code == 200
+        assert r.json['version'] == 2
+        assert r.headers['ETag'] != tag
+
+        theapp.state['version'] = 1
+        assert client.get('/item/1').headers['ETag'] == tag
+        r = client.get('/item/2', headers={'If-None-Match': tag})
+        assert r.status_code == 200
+        assert r.headers['ETag'] != tag
+        assert theapp.state['calls'] == 4
+
+    # Test: version tag is used for range responses.
+    def test_ranges(self, theapp):
+        theapp.config['JSON_ACCEPT_RANGES'] = True
+        client = theapp.test_client()
+        r = client.get('/item/1')
+        tag = r.headers['ETag']
+        assert r.headers['Accept-Ranges'] == 'bytes'
+
+        for _ in range(3):
+            r = client.get('/item/1', headers={'If-None-Match': tag})
+            assert r.status_code == 304
+        assert theapp.state['calls'] == 1
+
+        r = client.get('/item/1', headers={'Range': 'bytes=0-4',
+                                           'If-Range': tag})
+        assert r.status_code == 206
+        assert r.headers['ETag'] == tag
+        assert theapp.state['calls'] == 2
+
+    # Test: tags depend on the response format.
+    def test_binary(self, theapp):
+        theapp.config['JSON_BINARY_FORMATS'] = ['application/msgpack']
+        client = theapp.test_client()
+        r1 = client.get('/item/1')
+        r2 = client.get('/item/1', headers={'Accept': 'application/msgpack'})
+        assert r1.headers['ETag'] != r2.headers['ETag']
+        assert 'Accept' in r1.headers['Vary']
+
+        r = client.get('/item/1', headers={'If-None-Match': r1.headers['ETag'],
+                                           'Accept': 'application/msgpack'})
+        assert r.status_code == 200
+
+    # Test: errors, non-GET requests and None version are not tagged.
+    def test_skip(self, theapp):
+        client = theapp.test_client()
+        r = client.get('/item/0')
+        assert r.status_code == 404
+        assert 'ETag' not in r.headers
+
+        r = client.post('/item/1', headers={'If-None-Match': '*'})
+        assert r.status_code == 200
+        assert 'ETag' not in r.headers
+        assert theapp.state['keys'] == [{'id': 0}]
+
+        r = client.get('/none', headers={'If-None-Match': '*'})
+        assert r.status_code == 200
+        assert 'ETag' not in r.headers
+        assert theapp.state['calls'] == 3
@@ -0,0 +1,94 @@
+"""
+This module provides tests for floats rounding (JSON_FLOAT_PRECISION).
+"""
+import pytest
+from flask_json import as_json, json_response
+
+
+class Point(object):
+    def __init__(self, x):
+        self.x = x
+
+    def __json__(self):
+        return {'x': self.x}
+
+
+@pytest.fixture
+def theapp(app):
+    app.config['JSON_FLOAT_PRECISION'] = 3
+
+    @app.route('/default')
+    @as_json
+    def default():
+        return dict(value=2 / 3.0)
+
+    @app.route('/view')
+    @as_json(float_precision=5, returns=list)
+    def view():
+        return [2 / 3.0]
+
+    @app.route('/off')
+    @as_json(float_precision=0)
+    def off():
+        return dict(value=0.1 + 0.2)
+
+    yield app
+
+
+class TestFloatPrecision(object):
+    # Test: floats are not rounded by default.
+    def test_disabled(self, app, app_request):
+        assert app.config['JSON_FLOAT_PRECISION'] is None
+        r = json_response(data_=[0.1 + 0.2])
+        assert r.get_data() == b'[0.30000000000000004]\n'
+
+    # Test: floats are rounded to significant digits, nested values and
+    # other types are supported.
+    def test_round(self, app, app_request):
+        app.config['JSON_FLOAT_PRECISION'] = 4
+        data = dict(a=0.1 + 0.2, b=[123456.789, (1e-7 / 3, 1)],
+                    c=True, d=10, e=float('inf'), f=0.0, g=-2 / 3.0)
+        r = json_response(add_status_=False, data_=data)
+        assert r.json == dict(a=0.3, b=[123500.0, [3.333e-8, 1]],
+                              c=True, d=10, e=float('inf'), f=0.0,
+                              g=-0.6667)
+
+    # Test: values returned by encoders are rounded too.
+    def test_encoders(self, app, app_request):
+        app.config['JSON_FLOAT_PRECISION'] = 2
+        app.config['JSON_USE_ENCODE_METHODS'] = True
+        r = json_response(data_=[Point(1 / 3.0), (x / 3.0 for x in [1])])
+        assert r.get_data() == b'[{"x":0.33},[0.33]]\n'
+
+    # Test: per-response precision.
+    def test_response(self, app, app_request):
+        app.config['JSON_FLOAT_PRECISION'] = 2
+        r = json_response(data_=[1 / 3.0], float_precision_=4)
+        assert r.json == [0.3333]
+
+    # Test: provider uses the option too.
+    def test_provider(self, app, app_request):
+        app.config['JSON_FLOAT_PRECISION'] = 2
+        assert app.json.dumps(1 / 3.0) == '0.33'
+        assert app.json.dumps(1 / 3.0, float_precision=3) == '0.333'
+
+    # Test: @as_json(float_precision=...).
+    def test_as_json(self, theapp, client):
+        assert client.get('/default').json['value'] == 0.667
+        assert client.get('/view').json == [0.66667]
+        assert client.get('/off').json['value'] == 0.1 + 0.2
+
+    # Test: numpy arrays are rounded in bulk.
+    def test_numpy(self, app, app_request):
+        numpy = pytest.importorskip('numpy')
+        app.config['JSON_FLOAT_PRECISION'] = 3
+        data = dict(
+            a=numpy.array([1 / 3.0, 123456.0, -0.0012345, 0.0,
+                           float('nan')]),
+            b=numpy.array([[0.1, 0.2]], dtype=numpy.float32),
+            c=numpy.arange(3))
+        r = json_response(add_status_=False, data_=data)
+        body = r.get_data(as_text=True)
+        assert '"a":[0.333,123000.0,-0.00123,0.0,NaN]' in body
+        assert '"b":[[0.1,0.2]]' in body
+        assert '"c":[0,1,2]' in body
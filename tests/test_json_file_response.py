@@ -0,0 +1,92 @@
+"""
+This module provides tests for json_file_response().
+"""
+import hashlib
+import pytest
+from werkzeug.exceptions import BadRequest
+from flask_json import json_file_response, _json_files
+
+
+@pytest.fixture
+def jsonfile(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_bytes(b'{"items": [1, 2, 3]}\n')
+    yield path
+    _json_files.clear()
+
+
+class TestJsonFileResponse(object):
+    # Test: file content is sent as is.
+    def test_simple(self, app, client, jsonfile):
+        @app.route('/file')
+        def view():
+            return json_file_response(jsonfile, headers_={'X-A': '1'})
+
+        r = client.get('/file')
+        assert r.status_code == 200
+        assert r.mimetype == 'application/json'
+        assert r.json == {'items': [1, 2, 3]}
+        assert r.headers['Content-Length'] == str(jsonfile.stat().st_size)
+        assert r.headers['X-A'] == '1'
+        assert r.headers['ETag']
+        assert r.headers['Last-Modified']
+        r.close()
+
+        # Conditional request.
+        r = client.get('/file', headers={'If-None-Match': r.headers['ETag']})
+        assert r.status_code == 304
+        assert r.data == b''
+        r.close()
+
+    # Test: file is validated once until it's modified.
+    def test_validate(self, app, jsonfile):
+        with app.test_request_context():
+            json_file_response(jsonfile, validate=True).close()
+            assert str(jsonfile) in _json_files
+
+            jsonfile.write_bytes(b'{"items": ')
+            with pytest.raises(ValueError):
+                json_file_response(jsonfile, validate=True)
+
+            # Not validated by default.
+            json_file_response(jsonfile).close()
+
+            # Unvalidated file is validated on request.
+            with pytest.raises(ValueError):
+                json_file_response(jsonfile, validate=True)
+
+    # Test: checks cached without validation are not trusted.
+    def test_validate_after_checksum(self, app, jsonfile):
+        jsonfile.write_bytes(b'{"items": ')
+        with app.test_request_context():
+            json_file_response(jsonfile, checksum=True).close()
+            with pytest.raises(ValueError):
+                json_file_response(jsonfile, validate=True)
+
+    # Test: checksum is used as ETag.
+    def test_checksum(self, app, jsonfile):
+        digest = hashlib.sha256(jsonfile.read_bytes()).hexdigest()
+        with app.test_request_context():
+            r = json_file_response(jsonfile, checksum=True)
+            assert r.headers['ETag'] == '"%s"' % digest
+            r.close()
+            assert _json_files[str(jsonfile)][2] == digest
+
+    # Test: JSONP response from the file.
+    def test_jsonp(self, app, client, jsonfile):
+        @app.route('/file')
+        def view():
+            return json_file_response(jsonfile, callback='foo')
+
+        r = client.get('/file')
+        assert r.status_code == 200
+        assert r.headers['Content-Type'] == 'application/javascript'
+        assert r.get_data(as_text=True) == 'foo({"items": [1, 2, 3]});'
+        assert r.headers['Content-Length'] == str(len(r.data))
+        r.close()
+
+        with app.test_request_context():
+            with pytest.raises(BadRequest):
+                json_file_response(jsonfile, callback='alert(1)')
+            with pytest.raises(BadRequest):
+                json_file_response(jsonfile, callback='café')
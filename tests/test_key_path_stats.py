@@ -0,0 +1,82 @@
+"""
+This module provides tests for encode cost attribution by key paths.
+"""
+from datetime import date
+import pytest
+from flask_json import as_json, json_response
+
+
+DATA = {
+    'items': [
+        {'id': 1, 'owner': {'name': 'a', 'avatar': 'x' * 100}, 'tags': []},
+        {'id': 2, 'owner': {'name': 'b', 'avatar': 'y' * 100}, 'tags': [1]},
+    ],
+    'total': 2,
+    'nums': {10: 'a', 9: 'b'},
+    'text': 'Привет "world"',
+    'float': 0.5,
+    'flags': [True, False, None],
+    'day': date(2020, 1, 2),
+}
+
+
+@pytest.fixture
+def theapp(app):
+    app.config['JSON_KEY_PATH_STATS'] = True
+
+    @app.route('/items')
+    @as_json
+    def items():
+        return dict(items=[{'id': x, 'gen': (y for y in range(x))}
+                           for x in range(3)])
+
+    yield app
+
+
+class TestKeyPathStats(object):
+    # Test: output is the same as without stats.
+    @pytest.mark.parametrize('kwargs', [
+        {},
+        {'indent': 2},
+        {'separators': (',', ':')},
+        {'sort_keys': False},
+        {'ensure_ascii': False},
+    ])
+    def test_output(self, app, app_request, kwargs):
+        expected = app.json.dumps(DATA, **kwargs)
+        app.config['JSON_KEY_PATH_STATS'] = True
+        assert app.json.dumps(DATA, **kwargs) == expected
+
+    # Test: stats are collected per endpoint and path.
+    def test_report(self, theapp, client):
+        r = client.get('/items')
+        assert r.json['items'][2] == {'id': 2, 'gen': [0, 1]}
+        client.get('/items')
+
+        report = theapp.json.key_path_report()
+        assert list(report) == ['items']
+        paths = dict((x['path'], x) for x in report['items'])
+        assert sorted(paths) == ['items', 'items[*]', 'items[*].gen',
+                                 'items[*].gen[*]', 'items[*].id', 'status']
+        assert paths['items[*]']['count'] == 6
+        assert paths['items[*].gen[*]']['count'] == 6
+        assert paths['items[*].id']['size'] == 6
+        assert paths['items']['time'] >= paths['items[*].id']['time']
+        times = [x['time'] for x in report['items']]
+        assert times == sorted(times, reverse=True)
+
+        assert theapp.json.key_path_report('items', reset=True) == \
+            report['items']
+        assert theapp.json.key_path_report() == {}
+
+    # Test: paths of nested values and encoders results.
+    def test_paths(self, app, app_request):
+        app.config['JSON_KEY_PATH_STATS'] = True
+        json_response(data_=DATA)
+        # No endpoint for the test request.
+        report = app.json.key_path_report()
+        paths = dict((x['path'], x) for x in report[None])
+        assert paths['items[*].owner.avatar']['size'] == 204
+        assert paths['items[*].owner.avatar']['count'] == 2
+        assert paths['nums.9']['size'] == 3
+        assert paths['day']['size'] == len(app.json.dumps(DATA['day']))
@@ -0,0 +1,93 @@
+"""
+This module provides tests for memory accounting of JSON responses.
+"""
+import logging
+import tracemalloc
+import pytest
+from flask_json import as_json, json_response, JsonError
+
+
+@pytest.fixture
+def theapp(app):
+    @app.route('/large')
+    @as_json
+    def large():
+        return dict(items=[{'id': x, 'name': 'item%d' % x}
+                           for x in range(20000)])
+
+    yield app
+    tracemalloc.stop()
+
+
+@pytest.mark.usefixtures('theapp')
+class TestMemory(object):
+    # Test: memory is not measured by default.
+    def test_disabled(self, app, app_request):
+        r = json_response(x=1)
+        assert not hasattr(r, 'json_memory_peak')
+
+    # Test: peak memory is stored in the response.
+    def test_peak(self, app, app_request):
+        app.config['JSON_TRACE_MEMORY'] = True
+        r = json_response(data_=list(range(100000)))
+        assert r.json_memory_peak >= len(r.get_data())
+
+        r = json_response(x=1)
+        assert 0 <= r.json_memory_peak < 100000
+
+    # Test: tracing is stopped after the response is built, but only if it's
+    # started for the response.
+    def test_stop(self, app, app_request):
+        app.config['JSON_TRACE_MEMORY'] = True
+        json_response(x=1)
+        assert not tracemalloc.is_tracing()
+
+        tracemalloc.start()
+        json_response(x=1)
+        assert tracemalloc.is_tracing()
+
+    # Test: large responses are logged.
+    def test_log(self, app, client, caplog):
+        app.config['JSON_TRACE_MEMORY'] = True
+        app.config['JSON_MEMORY_LOG_THRESHOLD'] = 100000
+        with caplog.at_level(logging.WARNING):
+            client.get('/large')
+        assert len(caplog.records) == 1
+        assert caplog.records[0].getMessage().startswith(
+            'JSON response /large? used ')
+
+    # Test: encoding is aborted if memory limit is exceeded.
+    def test_limit(self, app, client):
+        app.config['JSON_MEMORY_LIMIT'] = 100000
+        r = client.get('/large')
+        assert r.status_code == 507
+        assert r.json == {'status': 507,
+                          'description': 'Response exceeds memory limit.'}
+
+        app.config['JSON_MEMORY_LIMIT'] = 100 * 1024 * 1024
+        r = client.get('/large')
+        assert r.status_code == 200
+        assert len(r.json['items']) == 20000
+        assert not tracemalloc.is_tracing()
+
+    # Test: joined result is accounted too.
+    def test_limit_join(self, app):
+        data = ['x' * 1000] * 10
+        with app.test_request_context():
+            expected = app.json.dumps(data)
+            app.config['JSON_MEMORY_LIMIT'] = 15000
+            with pytest.raises(JsonError):
+                app.json.dumps(data)
+            app.config['JSON_MEMORY_LIMIT'] = 30000
+            assert app.json.dumps(data) == expected
+
+    # Test: output with the memory limit is the same as without it.
+    @pytest.mark.parametrize('kwargs', [
+        {}, {'sort_keys': True}, {'indent': 2}, {'skipkeys': True}])
+    def test_limit_output(self, app, kwargs):
+        data = {'b': [1, {'y': 'é', 'x': [2.5, None]}], 'a': {},
+                'c': {1: 'one', False: 'false', 2.5: 'float'},
+                'd': [], 'e': [[[[1]]]]}
+        expected = app.json.dumps(data, **kwargs)
+        app.config['JSON_MEMORY_LIMIT'] = 100 * 1024 * 1024
+        assert app.json.dumps(data, **kwargs) == expected
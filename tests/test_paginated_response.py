@@ -0,0 +1,113 @@
+"""
+This module provides tests for paginated_response().
+"""
+import gzip
+import json
+import pytest
+from flask_json import paginated_response
+
+
+class Item(object):
+    def __init__(self, id):
+        self.id = id
+
+    def __json__(self):
+        return {'id': self.id}
+
+
+ROWS = [{'id': x, 'name': 'item%d' % x} for x in range(1, 8)]
+
+
+# Emulates keyset query: items with key greater than 'after'.
+def query_rows(after, limit):
+    rows = [x for x in ROWS if after is None or x['id'] > after]
+    return iter(rows[:limit])
+
+
+@pytest.fixture
+def theapp(app):
+    app.config['JSON_PAGINATION_LIMIT'] = 3
+
+    @app.route('/items')
+    def items():
+        return paginated_response(query_rows, key='id')
+
+    @app.route('/objects')
+    def objects():
+        app.config['JSON_USE_ENCODE_METHODS'] = True
+        return paginated_response(
+            lambda after, limit: [Item(x) for x in range(1, limit + 1)],
+            key='id', limit=2, add_status_=False, total=100)
+
+    yield app
+
+
+@pytest.mark.usefixtures('theapp')
+class TestPaginatedResponse(object):
+    # Test: walk through all pages using next cursors.
+    def test_pages(self, client):
+        r = client.get('/items')
+        assert r.status_code == 200
+        assert r.mimetype == 'application/json'
+        assert r.json['status'] == 200
+        assert r.json['items'] == ROWS[:3]
+        cursor = r.json['next']
+        assert isinstance(cursor, str)
+
+        r = client.get('/items?cursor=' + cursor)
+        assert r.json['items'] == ROWS[3:6]
+
+        r = client.get('/items?cursor=' + r.json['next'])
+        assert r.json['items'] == ROWS[6:]
+        assert r.json['next'] is None
+        assert 'Link' not in r.headers
+
+    # Test: Link header points to the next page and keeps other args.
+    def test_link_header(self, client):
+        r = client.get('/items?x=1')
+        link = r.headers['Link']
+        assert link == '<http://localhost/items?x=1&cursor=%s>; rel="next"' \
+            % r.json['next']
+
+    # Test: page size from the URL query is limited by config.
+    def test_limit_arg(self, app, client):
+        r = client.get('/items?limit=2')
+        assert r.json['items'] == ROWS[:2]
+
+        app.config['JSON_PAGINATION_MAX_LIMIT'] = 4
+        r = client.get('/items?limit=100')
+        assert r.json['items'] == ROWS[:4]
+
+    # Test: invalid cursor.
+    def test_invalid_cursor(self, client):
+        r = client.get('/items?cursor=@@@')
+        assert r.status_code == 400
+        assert r.json == {'status': 400, 'description': 'Invalid cursor.'}
+
+    # Test: items are passed through the encoders, extra fields are added.
+    def test_encoders(self, client):
+        r = client.get('/objects')
+        assert r.json['items'] == [{'id': 1}, {'id': 2}]
+        assert r.json['total'] == 100
+        assert 'status' not in r.json
+        assert r.json['next'] is not None
+
+    # Test: encoding errors are raised before the response is sent.
+    def test_encoding_error(self, app, client):
+        @app.route('/bad')
+        def bad():
+            return paginated_response(
+                lambda after, limit: [{'id': 1}, {'id': 2, 'x': object()}],
+                key='id')
+
+        app.config['PROPAGATE_EXCEPTIONS'] = False
+        r = client.get('/bad')
+        assert r.status_code == 500
+
+    # Test: pages are compressed like other responses.
+    def test_compression(self, app, client):
+        app.config['JSON_COMPRESSION'] = ['gzip']
+        app.config['JSON_COMPRESSION_MIN_SIZE'] = 0
+        r = client.get('/items', headers={'Accept-Encoding': 'gzip'})
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(r.data))['items'] == ROWS[:3]
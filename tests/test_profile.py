@@ -0,0 +1,104 @@
+"""
+This module provides tests for slow responses profiler.
+"""
+import json
+import os
+import pstats
+import time
+import pytest
+from flask_json import as_json
+
+
+@pytest.fixture
+def theapp(app, tmp_path):
+    app.config['JSON_PROFILE_DIR'] = str(tmp_path / 'profiles')
+
+    @app.route('/fast')
+    @as_json
+    def fast():
+        return dict(items=list(range(10)))
+
+    @app.route('/slow')
+    @as_json
+    def slow():
+        time.sleep(0.05)
+        return [1]
+
+    yield app
+
+
+# Returns list of saved profiles metadata.
+def profiles(app):
+    directory = app.config['JSON_PROFILE_DIR']
+    if not os.path.isdir(directory):
+        return []
+    result = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as f:
+                meta = json.load(f)
+            meta['prof'] = os.path.join(directory, name[:-5] + '.prof')
+            result.append(meta)
+    return result
+
+
+@pytest.mark.usefixtures('theapp')
+class TestProfile(object):
+    # Test: nothing is profiled by default.
+    def test_disabled(self, app, client):
+        client.get('/slow')
+        assert profiles(app) == []
+
+        app.config['JSON_PROFILE_DIR'] = None
+        app.config['JSON_PROFILE_SAMPLE_RATE'] = 1.0
+        client.get('/fast')
+
+    # Test: sampled requests are saved with metadata.
+    def test_sample(self, app, client):
+        app.config['JSON_PROFILE_SAMPLE_RATE'] = 1.0
+        r = client.get('/fast?x=1')
+        items = profiles(app)
+        assert len(items) == 1
+        meta = items[0]
+        assert meta['endpoint'] == 'fast'
+        assert meta['method'] == 'GET'
+        assert meta['url'] == '/fast?x=1'
+        assert meta['status'] == 200
+        assert meta['payload_size'] == len(r.get_data())
+        assert meta['sampled'] is True
+        assert meta['duration'] > 0
+        stats = pstats.Stats(meta['prof'])
+        assert any(func[2] == 'fast' for func in stats.stats)
+
+    # Test: only slow requests are saved if threshold is set.
+    def test_threshold(self, app, client):
+        app.config['JSON_PROFILE_THRESHOLD'] = 0.04
+        client.get('/fast')
+        assert profiles(app) == []
+
+        client.get('/slow')
+        items = profiles(app)
+        assert len(items) == 1
+        assert items[0]['endpoint'] == 'slow'
+        assert items[0]['sampled'] is False
+        assert items[0]['duration'] >= 0.04
+
+    # Test: old profiles are removed.
+    def test_keep(self, app, client):
+        app.config['JSON_PROFILE_SAMPLE_RATE'] = 1.0
+        app.config['JSON_PROFILE_KEEP'] = 2
+        for _ in range(4):
+            client.get('/fast')
+        assert len(profiles(app)) == 2
+        assert len(os.listdir(app.config['JSON_PROFILE_DIR'])) == 4
+
+    # Test: saving errors are logged and don't fail the request.
+    def test_save_error(self, app, client, tmp_path, caplog):
+        path = tmp_path / 'file'
+        path.write_text('')
+        app.config['JSON_PROFILE_DIR'] = str(path)
+        app.config['JSON_PROFILE_SAMPLE_RATE'] = 1.0
+        r = client.get('/fast')
+        assert r.status_code == 200
+        assert r.json == {'items': list(range(10)), 'status': 200}
+        assert 'Failed to save JSON profile' in caplog.text
@@ -0,0 +1,121 @@
+"""
+This module provides tests for HTTP Range requests support.
+"""
+import pytest
+from flask_json import (
+    json_response, json_file_response, json_constant, as_json
+)
+
+
+@pytest.fixture
+def theapp(app, tmp_path):
+    app.config['JSON_ACCEPT_RANGES'] = True
+    path = tmp_path / 'data.json'
+    path.write_bytes(b'[0,1,2,3,4,5,6,7,8,9]')
+
+    @app.route('/data')
+    def data():
+        return json_response(data_=list(range(10)))
+
+    @app.route('/error')
+    def error():
+        return json_response(400, data_=list(range(10)))
+
+    @app.route('/file')
+    def file():
+        return json_file_response(path)
+
+    @app.route('/static')
+    @as_json(static=True)
+    def static_data():
+        return list(range(10))
+
+    app.add_url_rule('/const', 'const', json_constant(list(range(10))))
+    yield app
+
+
+@pytest.mark.usefixtures('theapp')
+class TestRanges(object):
+    # Test: full response advertises ranges support.
+    def test_full(self, client):
+        r = client.get('/data')
+        assert r.status_code == 200
+        assert r.headers['Accept-Ranges'] == 'bytes'
+        assert r.headers['ETag']
+        assert r.data == b'[0,1,2,3,4,5,6,7,8,9]\n'
+
+    # Test: partial content.
+    @pytest.mark.parametrize('url', ['/data', '/const', '/file'])
+    def test_partial(self, client, url):
+        r = client.get(url, headers={'Range': 'bytes=1-4'})
+        assert r.status_code == 206
+        assert r.data == b'0,1,'
+        assert r.headers['Content-Length'] == '4'
+        assert r.headers['Content-Range'].startswith('bytes 1-4/')
+        r.close()
+
+    # Test: If-Range with current and outdated ETag.
+    def test_if_range(self, client):
+        etag = client.get('/data').headers['ETag']
+        r = client.get('/data', headers={'Range': 'bytes=-3',
+                                         'If-Range': etag})
+        assert r.status_code == 206
+        assert r.data == b'9]\n'
+
+        r = client.get('/data', headers={'Range': 'bytes=-3',
+                                         'If-Range': '"outdated"'})
+        assert r.status_code == 200
+        assert r.data == b'[0,1,2,3,4,5,6,7,8,9]\n'
+
+    # Test: If-None-Match with the response ETag.
+    @pytest.mark.parametrize('url', ['/data', '/const'])
+    def test_not_modified(self, client, url):
+        etag = client.get(url).headers['ETag']
+        r = client.get(url, headers={'If-None-Match': etag})
+        assert r.status_code == 304
+        assert r.data == b''
+
+        r = client.get(url, headers={'If-None-Match': '"outdated"'})
+        assert r.status_code == 200
+
+    # Test: responses may be created without request context.
+    def test_app_context(self, app):
+        with app.app_context():
+            r = json_response(data_=[1, 2])
+        assert r.status_code == 200
+        assert r.headers['Accept-Ranges'] == 'bytes'
+        assert r.headers['ETag']
+
+    # Test: unsatisfiable range.
+    def test_not_satisfiable(self, client):
+        r = client.get('/data', headers={'Range': 'bytes=100-200'})
+        assert r.status_code == 416
+
+    # Test: ranges are not applied to errors and if disabled.
+    def test_skip(self, app, client):
+        r = client.get('/error', headers={'Range': 'bytes=1-4'})
+        assert r.status_code == 400
+        assert 'Accept-Ranges' not in r.headers
+
+        app.config['JSON_ACCEPT_RANGES'] = False
+        r = client.get('/data', headers={'Range': 'bytes=1-4'})
+        assert r.status_code == 200
+        assert 'Accept-Ranges' not in r.headers
+
+    # Test: conditional headers of the first request don't affect stored
+    # constant responses.
+    @pytest.mark.parametrize('url', ['/const', '/static'])
+    def test_constant(self, client, url):
+        r = client.get(url, headers={'Range': 'bytes=1-4'})
+        assert r.status_code == 206
+        r.close()
+        r = client.get(url)
+        assert r.status_code == 200
+        assert r.data == b'[0,1,2,3,4,5,6,7,8,9]\n'
+        assert 'Content-Range' not in r.headers
+
+        r = client.get(url, headers={'If-None-Match': r.headers['ETag']})
+        assert r.status_code == 304
+        r = client.get(url)
+        assert r.status_code == 200
+        assert r.data == b'[0,1,2,3,4,5,6,7,8,9]\n'
@@ -2,7 +2,9 @@
 This module provides test for json_response().
 """
 import pytest
-from flask_json import json_response
+from flask import Response, request
+from flask_json import (as_json, json_response, json_constant, JsonResponse,
+                        LazyJsonResponse)
 
 
 @pytest.mark.usefixtures('app_request')
@@ -123,3 +125,141 @@ class TestResponse(object):
                           add_status_=True)
         assert r.json == dict(one=1, two='2', status=200)
         assert r.headers.get('MY-HEADER') == 'my value'
+
+    # Test: json_response() builds lightweight JsonResponse.
+    def test_json_response_class(self):
+        r = json_response(201, {'X-HEADER': 'x'}, val=1)
+        assert isinstance(r, JsonResponse)
+        assert r.status == '201 CREATED'
+        assert r.get_data() == b'{"status":201,"val":1}\n'
+        assert r.headers.get('Content-Length') == '23'
+        assert r.headers.get('X-HEADER') == 'x'
+
+    # Test: custom application's response class is respected.
+    def test_custom_response_class(self, app):
+        class MyResponse(Response):
+            pass
+
+        app.response_class = MyResponse
+        r = json_response(400, {'X-HEADER': 'x'}, val=1)
+        assert isinstance(r, MyResponse)
+        assert r.status_code == 400
+        assert r.json == {'status': 400, 'val': 1}
+        assert r.headers.get('X-HEADER') == 'x'
+
+
+# Test: JsonResponse construction.
+def test_json_response():
+    r = JsonResponse(b'[1]', 404, [('X-A', '1')],
+                     content_type='application/vnd.api+json')
+    assert r.status == '404 NOT FOUND'
+    assert r.status_code == 404
+    assert r.headers['Content-Type'] == 'application/vnd.api+json'
+    assert r.headers['Content-Length'] == '3'
+    assert r.headers['X-A'] == '1'
+    assert r.get_data() == b'[1]'
+
+    r = JsonResponse()
+    assert r.status_code == 200
+    assert r.headers['Content-Type'] == 'application/json'
+    assert r.headers['Content-Length'] == '0'
+
+    # Response is still mutable as usual.
+    r.set_data(b'{}')
+    r.status_code = 201
+    assert r.headers['Content-Length'] == '2'
+    assert r.status == '201 CREATED'
+
+
+# Test: json_constant() encodes the response once per application.
+def test_json_constant(app, client):
+    data = {'ok': True}
+    view = json_constant(data, headers_={'X-A': '1'})
+    app.add_url_rule('/health', 'health', view)
+
+    r = client.get('/health')
+    assert r.status_code == 200
+    assert r.json == {'ok': True, 'status': 200}
+    assert r.headers['X-A'] == '1'
+    assert data == {'ok': True}
+
+    with app.test_request_context():
+        r1 = view()
+        r2 = view()
+        assert r1 is not r2
+        assert r1.response[0] is r2.response[0]
+
+    r = client.get('/health')
+    assert r.json == {'ok': True, 'status': 200}
+
+    app.config['JSON_STATUS_FIELD_NAME'] = 'code'
+    r = client.get('/health')
+    assert r.json == {'ok': True, 'code': 200}
+
+
+# Test: json_constant() with non-dict data and custom status.
+def test_json_constant_non_dict(app):
+    view = json_constant([1, 2], status_=202)
+    with app.test_request_context():
+        r = view()
+        assert r.status_code == 202
+        assert r.json == [1, 2]
+
+
+class TestLazyResponse(object):
+    # Test: data is encoded on the first body access.
+    def test_encode(self, app_request):
+        r = json_response(lazy_=True, value=1)
+        assert isinstance(r, LazyJsonResponse)
+        assert not r.encoded
+        assert 'Content-Length' not in r.headers
+        assert r.get_json() == {'status': 200, 'value': 1}
+        assert r.encoded
+        assert r.headers['Content-Length'] == str(len(r.get_data()))
+
+    # Test: data is encoded with the captured application context.
+    def test_app_context(self, app):
+        with app.test_request_context('/'):
+            app.config['JSON_ADD_STATUS'] = False
+            r = json_response(lazy_=True, data_=[1])
+        assert r.get_data() == b'[1]\n'
+
+    # Test: HEAD requests and replaced responses are not encoded.
+    def test_not_encoded(self, app, client):
+        responses = []
+
+        @app.route('/lazy', methods=['GET', 'HEAD'])
+        @as_json(lazy=True)
+        def lazy():
+            return dict(value=1)
+
+        @app.route('/replaced')
+        def replaced():
+            return json_response(lazy_=True, value=1)
+
+        @app.after_request
+        def after_request(response):
+            responses.append(response)
+            if request.path == '/replaced':
+                return json_response(value=2)
+            return response
+
+        r = client.head('/lazy')
+        assert r.status_code == 200
+        assert r.get_data() == b''
+        assert not responses[-1].encoded
+
+        r = client.get('/replaced')
+        assert r.json['value'] == 2
+        assert not responses[-1].encoded
+
+        r = client.get('/lazy')
+        assert r.json == {'status': 200, 'value': 1}
+        assert r.headers['Content-Length'] == str(len(r.get_data()))
+        assert responses[-1].encoded
+
+    # Test: lazy response is not used for range requests.
+    def test_ranges(self, app, app_request):
+        app.config['JSON_ACCEPT_RANGES'] = True
+        r = json_response(lazy_=True, value=1)
+        assert type(r) is JsonResponse
@@ -0,0 +1,77 @@
+"""
+This module provides tests for Server-Timing header support.
+"""
+import re
+import pytest
+from flask import request
+from flask_json import as_json, as_json_p
+
+
+# Returns Server-Timing header as dict: name -> duration.
+def parse_timing(response):
+    header = response.headers['Server-Timing']
+    items = (re.match(r'(\w+);dur=(\d+\.\d{3})$', x) for x in
+             header.split(', '))
+    return dict((m.group(1), float(m.group(2))) for m in items)
+
+
+@pytest.fixture
+def theapp(app):
+    @app.route('/view', methods=['GET', 'POST'])
+    @as_json
+    def view():
+        return dict(data=request.get_json(silent=True))
+
+    @app.route('/on')
+    @as_json(timing=True)
+    def on():
+        return [1]
+
+    @app.route('/off')
+    @as_json(timing=False)
+    def off():
+        return [1]
+
+    @app.route('/jsonp')
+    @as_json_p(timing=True)
+    def jsonp():
+        return dict(x=1)
+
+    yield app
+
+
+@pytest.mark.usefixtures('theapp')
+class TestServerTiming(object):
+    # Test: header is not added by default.
+    def test_disabled(self, client):
+        r = client.get('/view')
+        assert 'Server-Timing' not in r.headers
+
+    # Test: enabled by config, decode time is added for JSON requests.
+    def test_config(self, app, client):
+        app.config['JSON_SERVER_TIMING'] = True
+        r = client.get('/view')
+        assert list(parse_timing(r)) == ['view', 'encode', 'total']
+
+        r = client.post_json('/view', dict(x=1))
+        assert r.json['data'] == dict(x=1)
+        timing = parse_timing(r)
+        assert list(timing) == ['decode', 'view', 'encode', 'total']
+        assert timing['total'] >= timing['view'] >= timing['decode']
+
+        r = client.get('/off')
+        assert 'Server-Timing' not in r.headers
+
+    # Test: enabled per view.
+    def test_view(self, client):
+        r = client.get('/on')
+        assert list(parse_timing(r)) == ['view', 'encode', 'total']
+
+    # Test: JSONP wrapping is measured separately.
+    def test_jsonp(self, client):
+        r = client.get('/jsonp?callback=foo')
+        assert r.get_data().startswith(b'foo(')
+        assert list(parse_timing(r)) == ['view', 'encode', 'jsonp', 'total']
+
+        r = client.get('/jsonp')
+        assert list(parse_timing(r)) == ['view', 'encode', 'total']
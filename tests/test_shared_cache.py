@@ -0,0 +1,162 @@
+"""
+This module provides tests for SharedMemoryCache and @as_json(cache=...).
+"""
+import multiprocessing
+import pytest
+import flask_json
+from flask import Flask, request
+from flask_json import FlaskJSON, SharedMemoryCache, as_json
+
+pytestmark = pytest.mark.skipif(flask_json.shared_memory is None,
+                                reason="requires python >= 3.8")
+
+
+@pytest.fixture
+def cache():
+    cache = SharedMemoryCache(slots=8, slot_size=64, ways=2)
+    yield cache
+    cache.close()
+
+
+# Child process function for test_multiprocess().
+def _child(cache, key, value):
+    cache.set(key, value)
+
+
+class TestSharedMemoryCache(object):
+    # Test: basic operations.
+    def test_get_set(self, cache):
+        assert cache.get('a') is None
+        assert cache.set('a', b'value')
+        assert cache.get('a') == b'value'
+        assert cache.get(b'a') == b'value'
+        assert cache.hits == 2 and cache.misses == 1
+
+        cache.set('a', b'new')
+        assert cache.get('a') == b'new'
+
+        cache.delete('a')
+        assert cache.get('a') is None
+
+        cache.set('b', b'1')
+        cache.clear()
+        assert cache.get('b') is None
+
+    # Test: too large values are not cached.
+    def test_too_large(self, cache):
+        assert not cache.set('a', b'x' * 65)
+        assert cache.get('a') is None
+
+    # Test: expiration.
+    def test_ttl(self, cache):
+        cache.set('a', b'1', ttl=-1)
+        assert cache.get('a') is None
+        cache.set('a', b'1', ttl=100)
+        assert cache.get('a') == b'1'
+
+    # Test: least recently used entry is evicted from the full set.
+    def test_lru(self):
+        cache = SharedMemoryCache(slots=2, slot_size=8, ways=2)
+        try:
+            cache.set('a', b'1')
+            cache.set('b', b'2')
+            cache.get('a')
+            cache.set('c', b'3')
+            assert cache.get('a') == b'1'
+            assert cache.get('b') is None
+            assert cache.get('c') == b'3'
+        finally:
+            cache.close()
+
+    # Test: attach to existing block.
+    def test_attach(self, cache):
+        cache.set('a', b'1')
+        other = SharedMemoryCache(cache.name, create=False)
+        try:
+            assert (other.slots, other.slot_size, other.ways) == (8, 64, 2)
+            assert other.get('a') == b'1'
+        finally:
+            other.close()
+        assert cache.get('a') == b'1'
+
+    # Test: values set in other process are visible.
+    @pytest.mark.skipif(
+        'fork' not in multiprocessing.get_all_start_methods(),
+        reason="requires fork")
+    def test_multiprocess(self, cache):
+        ctx = multiprocessing.get_context('fork')
+        procs = [ctx.Process(target=_child, args=(cache, 'k%d' % i, b'%d' % i))
+                 for i in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+            assert p.exitcode == 0
+        assert [cache.get('k%d' % i) for i in range(4)] == \
+            [b'0', b'1', b'2', b'3']
+
+
+# Test: @as_json with cache.
+def test_as_json_cache(app, client):
+    cache = SharedMemoryCache(slots=8, slot_size=1024, ways=2)
+    calls = []
+
+    @app.route('/view', methods=['GET', 'POST'])
+    @as_json(cache=cache)
+    def view():
+        calls.append(1)
+        return dict(value=len(calls)), {'X-A': '1'}
+
+    @app.route('/error')
+    @as_json(cache=cache)
+    def error():
+        calls.append(1)
+        return None, 400
+
+    try:
+        for _ in range(2):
+            r = client.get('/view?x=1')
+            assert r.status_code == 200
+            assert r.json == {'value': 1, 'status': 200}
+            assert r.headers['X-A'] == '1'
+            assert r.headers['Content-Type'] == 'application/json'
+        assert len(calls) == 1
+
+        # Different URL.
+        assert client.get('/view?x=2').json['value'] == 2
+
+        # Not cached methods and statuses.
+        assert client.post('/view?x=1').json['value'] == 3
+        client.get('/error')
+        client.get('/error')
+        assert len(calls) == 5
+    finally:
+        cache.close()
+
+
+# Test: applications and hosts have separate cache entries.
+def test_as_json_cache_key():
+    cache = SharedMemoryCache(slots=8, slot_size=1024, ways=2)
+    apps = []
+    for name in ('app1', 'app2'):
+        app = Flask(name)
+        FlaskJSON(app)
+
+        @app.route('/view')
+        @as_json(cache=cache)
+        def view(name=name):
+            return dict(app=name, host=request.host)
+        apps.append(app)
+
+    try:
+        for _ in range(2):
+            for app in apps:
+                client = app.test_client()
+                for host in ('a.test', 'b.test'):
+                    r = client.get('/view', headers={'Host': host})
+                    assert r.json == {'app': app.import_name, 'host': host,
+                                      'status': 200}
+        assert cache.hits == 4
+        assert cache.misses == 4
+    finally:
+        cache.close()